@@ -2,17 +2,23 @@
 """Main program."""
 
 import argparse
-import multiprocessing
+import copy
 import sys
 
-from ansiblelater import LOG, __version__, logger
-from ansiblelater.candidate import Candidate
-from ansiblelater.rule import SingleRules
-from ansiblelater.settings import Settings
+from yamllint.config import YamlLintConfigError
 
+from ansiblelater import LOG, __version__, executor, logger, utils
+from ansiblelater.settings import DISCOVERY_MODES, Settings
+from ansiblelater.watch import Watcher
 
-def main():
-    """Run main program."""
+
+def main(argv=None):
+    """
+    Run main program.
+
+    :param argv: Optional list of command line arguments, defaults to `sys.argv`.
+
+    """
     parser = argparse.ArgumentParser(
         description="Validate Ansible files against best practice guideline"
     )
@@ -48,7 +54,58 @@ def main():
         dest="rules.exclude_filter",
         metavar="TAGS",
         action="append",
-        help="exclude rules by given it/tags",
+        help="exclude rules by given id/tags",
+    )
+    parser.add_argument(
+        "--discovery",
+        dest="rules.discovery",
+        choices=DISCOVERY_MODES,
+        help="discover files by directory walk or from the git index",
+    )
+    parser.add_argument(
+        "--diff",
+        dest="diff.ref",
+        metavar="REF",
+        help="only report errors in lines changed since the given git ref",
+    )
+    parser.add_argument(
+        "--diff-file",
+        dest="diff.file",
+        metavar="FILE",
+        help="only report errors in lines changed by the given unified diff",
+    )
+    parser.add_argument(
+        "--cache",
+        dest="cache.enabled",
+        action="store_const",
+        const=True,
+        help="reuse results of unchanged files from previous runs",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="executor.jobs",
+        metavar="N",
+        type=int,
+        help="number of parallel review jobs (default: auto)",
+    )
+    parser.add_argument(
+        "--backend",
+        dest="executor.backend",
+        choices=executor.BACKENDS,
+        help="run reviews in-process, in worker threads or in worker processes",
+    )
+    parser.add_argument(
+        "--order",
+        dest="executor.order",
+        choices=executor.ORDERS,
+        help="report files in path order or as soon as they are reviewed",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="keep running and review files again when they change",
     )
     parser.add_argument(
         "-v", dest="logging.level", action="append_const", const=-1, help="increase log level"
@@ -59,43 +116,31 @@ def main():
     parser.add_argument("rules.files", nargs="*")
     parser.add_argument("-V", "--version", action="version", version=f"%(prog)s {__version__}")
 
-    args = parser.parse_args().__dict__
+    args = parser.parse_args(argv).__dict__
+    watch = args.pop("watch")
 
-    settings = Settings(args=args)
+    settings = Settings(args=copy.deepcopy(args))
     config = settings.config
 
     logger.update_logger(LOG, config["logging"]["level"], config["logging"]["json"])
-    SingleRules(config["rules"]["dir"])
-
-    workers = max(multiprocessing.cpu_count() - 2, 2)
-    p = multiprocessing.Pool(workers)
-    tasks = []
-    for filename in config["rules"]["files"]:
-        candidate = Candidate.classify(filename, settings)
-        if candidate:
-            if candidate.binary:
-                LOG.info(f"Not reviewing binary file {filename}")
-                continue
-            if candidate.vault:
-                LOG.info(f"Not reviewing vault file {filename}")
-                continue
-
-            LOG.info(f"Reviewing all of {candidate}")
-            tasks.append(candidate)
-        else:
-            LOG.info(f"Couldn't classify file {filename}")
-
-    errors = sum(p.map(_review_wrapper, tasks))
-    p.close()
-    p.join()
 
-    return_code = 1 if errors != 0 else 0
+    # Warm up the shared state once, forked workers inherit it.
+    try:
+        executor.prepare(config)
+    except YamlLintConfigError as e:
+        utils.sysexit_with_message(f"Invalid yamllint settings: {e}")
 
-    sys.exit(return_code)
+    if watch:
+        try:
+            Watcher(args, settings).watch()
+        except KeyboardInterrupt:
+            sys.exit(0)
 
+    errors = executor.run(settings)
 
-def _review_wrapper(candidate):
-    return candidate.review()
+    return_code = 1 if errors != 0 else 0
+
+    sys.exit(return_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,188 @@
+"""Persistent review result cache."""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from ansiblelater import LOG, __version__
+from ansiblelater.rule import RuleBase
+from ansiblelater.utils.moduleindex import ansible_version, environment
+
+# Files modified shortly before their cache entry was written are always hashed,
+# the stat data alone can not tell apart multiple writes within the same tick.
+RACY_WINDOW_NS = 2 * 10**9
+
+
+class ResultCache:
+    """
+    Store review results of unchanged files on disk.
+
+    Entries are stored per file and are only replayed if the file content, the
+    loaded rules, the rule related configuration, the ansible version and the
+    modules available to the file are unchanged. Files whose stat data (mtime,
+    size, inode) still matches the entry are not even hashed.
+    """
+
+    def __init__(self, config, rules_checksum, needs_ansible=False, module_dirs=()):
+        """
+        Initialize a new result cache.
+
+        :param config: The settings dict of the current run.
+        :param rules_checksum: Checksum of all loaded rule modules.
+        :param needs_ansible: Whether the selected rules resolve modules with ansible.
+        :param module_dirs: Directories of custom modules available to the reviewed file.
+        :returns: None
+
+        """
+        self.directory = config["cache"]["dir"]
+        self.key = self._get_key(config, rules_checksum, needs_ansible, module_dirs)
+
+    @classmethod
+    def _get_key(cls, config, rules_checksum, needs_ansible, module_dirs):
+        subtree = {
+            "ansible": config["ansible"],
+            "yamllint": config["yamllint"],
+            "include_filter": config["rules"]["include_filter"],
+            "exclude_filter": config["rules"]["exclude_filter"],
+        }
+        env = [ansible_version()]
+        if needs_ansible:
+            # Module resolution depends on the installed collections and modules.
+            env.append(environment())
+            env.extend(cls._modules(directory) for directory in module_dirs)
+
+        data = json.dumps([__version__, rules_checksum, subtree, env], sort_keys=True, default=str)
+
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _modules(directory):
+        modules = []
+        for root, _, files in os.walk(directory):
+            for name in files:
+                with contextlib.suppress(OSError):
+                    st = os.stat(os.path.join(root, name))
+                    modules.append([os.path.join(root, name), st.st_mtime_ns, st.st_size])
+
+        return [directory, sorted(modules)]
+
+    def _entry_path(self, path):
+        name = hashlib.sha1(os.path.normpath(path).encode("utf-8")).hexdigest()  # noqa: S324
+        return os.path.join(self.directory, name[:2], f"{name}.json")
+
+    @staticmethod
+    def _stat(path):
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+    @staticmethod
+    def _digest(path):
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def snapshot(self, path):
+        """
+        Return the stat data and digest of a file before it is reviewed.
+
+        Results are stored for the content the review started with, a file modified
+        during the review does not get the results of its old content.
+
+        :param path: Path of the file to review.
+        :returns: tuple of stat data and digest or None if the file can not be read
+
+        """
+        try:
+            return self._stat(path), self._digest(path)
+        except OSError as e:
+            LOG.debug(f"Failed to read {path} for the cache: {e}")
+            return None
+
+    def get(self, path):
+        """
+        Return cached results of the given file or None if there is no valid entry.
+
+        :param path: Path of the reviewed file.
+        :returns: list of `[rid, description, errors]` items or None
+
+        """
+        entry_path = self._entry_path(path)
+
+        try:
+            with open(entry_path, encoding="utf-8") as f:
+                entry = json.load(f)
+
+            if entry.get("key") != self.key or entry.get("path") != path:
+                return None
+
+            stat = self._stat(path)
+            if entry.get("stat") != stat:
+                if entry.get("digest") != self._digest(path):
+                    return None
+
+                self._write(entry_path, self._entry(path, stat, entry["digest"], entry["results"]))
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                LOG.debug(f"Ignoring cache entry of {path}: {e}")
+            return None
+
+        return [
+            [rid, description, [RuleBase.Error(**err) for err in errors]]
+            for rid, description, errors in entry["results"]
+        ]
+
+    def set(self, path, snapshot, results):
+        """
+        Store results of the given file.
+
+        Results that can not be stored as JSON without loss are skipped.
+
+        :param path: Path of the reviewed file.
+        :param snapshot: The `snapshot` of the file taken before the review.
+        :param results: List of `[rid, description, errors]` items.
+        :returns: None
+
+        """
+        if not all(isinstance(err, RuleBase.Error) for _, _, errors in results for err in errors):
+            return
+
+        results = [
+            [rid, description, [err.to_dict() for err in errors]]
+            for rid, description, errors in results
+        ]
+
+        try:
+            if json.loads(json.dumps(results)) != results:
+                return
+
+            entry = self._entry(path, *snapshot, results)
+            self._write(self._entry_path(path), entry)
+        except (OSError, TypeError, ValueError) as e:
+            LOG.debug(f"Failed to write cache entry of {path}: {e}")
+
+    def _entry(self, path, stat, digest, results):
+        if time.time_ns() - stat[0] < RACY_WINDOW_NS:
+            stat = None
+
+        return {"key": self.key, "path": path, "stat": stat, "digest": digest, "results": results}
+
+    def _write(self, entry_path, entry):
+        directory = os.path.dirname(entry_path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+            ignore = os.path.join(self.directory, ".gitignore")
+            if not os.path.exists(ignore):
+                with open(ignore, "w", encoding="utf-8") as f:
+                    f.write("# Created by ansible-later automatically.\n*\n")
+
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, entry_path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
@@ -3,12 +3,17 @@
 import codecs
 import copy
 import os
+from types import MappingProxyType
 
-from ansible.plugins.loader import module_loader
+import yaml
+from yamllint import linter
 
 from ansiblelater import LOG
+from ansiblelater.cache import ResultCache
+from ansiblelater.exceptions import LaterAnsibleError, LaterError
 from ansiblelater.logger import flag_extra
-from ansiblelater.rule import RuleBase, SingleRules
+from ansiblelater.rule import LineScanner, RuleBase, SingleRules
+from ansiblelater.utils import add_module_directory, load_yamllint_config, yamllint_options
 
 
 class Candidate:
@@ -26,8 +31,11 @@ class Candidate:
         self.filemeta = type(self).__name__.lower()
         self.kind = type(self).__name__.lower()
         self.faulty = False
+        self.cached = False
+        self.library = None
         self.config = settings.config
         self.settings = settings
+        self.artifacts = Artifacts(self)
 
         try:
             with codecs.open(filename, mode="rb", encoding="utf-8") as f:
@@ -36,58 +44,81 @@ class Candidate:
         except UnicodeDecodeError:
             self.binary = True
 
-    def _filter_rules(self):
-        target_rules = []
-        includes = self.config["rules"]["include_filter"]
-        excludes = self.config["rules"]["exclude_filter"]
-
-        if len(includes) == 0:
-            includes = [s.rid for s in self.rules]
-
-        for rule in self.rules:
-            if rule.rid in includes and rule.rid not in excludes:
-                target_rules.append(rule)
-
-        return target_rules
+    def _dispatch(self):
+        return SingleRules(self.config["rules"]["dir"]).dispatch(self.config["rules"])
 
     def review(self):
-        errors = 0
-        self.rules = SingleRules(self.config["rules"]["dir"]).rules
-
-        for rule in self._filter_rules():
-            if self.kind not in rule.types:
-                continue
-
+        return self.report(self.collect())
+
+    def collect(self):
+        rules = SingleRules(self.config["rules"]["dir"])
+
+        cache = None
+        if self.config["cache"]["enabled"]:
+            module_dirs = list(self.config["ansible"]["custom_modules"])
+            if self.library:
+                module_dirs.append(self.library)
+            cache = ResultCache(
+                self.config, rules.checksum, self._dispatch().needs_ansible, module_dirs
+            )
+
+        results = cache.get(self.path) if cache else None
+        self.cached = results is not None
+        if results is None:
+            snapshot = cache.snapshot(self.path) if cache else None
+            results = self._check()
+
+            if snapshot:
+                cache.set(self.path, snapshot, results)
+
+        return results
+
+    def _check(self):
+        results = []
+        dispatch = self._dispatch()
+        rules = dispatch.rules(self.kind)
+        self.artifacts.line_scanner = dispatch.line_scanner(self.kind)
+
+        for rule in rules:
             result = rule.check(self, self.config)
 
             if not result:
                 LOG.error(f"rule '{rule.rid}' returns an empty result object. Check failed!")
                 continue
 
+            results.append([rule.rid, rule.description, result.errors])
+
+        self.artifacts.clear()
+        return results
+
+    def report(self, results):
+        dispatch = self._dispatch()
+        errors = 0
+
+        for rule_id, description, rule_errors in results:
             labels = {
                 "tag": "review",
-                "rule": rule.description,
+                "rule": description,
                 "file": self.path,
                 "passed": True,
             }
 
-            if rule.rid and rule.rid.strip():
-                labels["rid"] = rule.rid
+            if rule_id and rule_id.strip():
+                labels["rid"] = rule_id
 
-            for err in result.errors:
+            for err in rule_errors:
                 err_labels = copy.copy(labels)
                 err_labels["passed"] = False
 
-                rid = self._format_id(rule.rid)
+                rid = self._format_id(rule_id)
                 path = self.path
-                description = rule.description
 
                 if isinstance(err, RuleBase.Error):
                     err_labels.update(err.to_dict())
 
                 msg = f"{rid}rule '{description}' not met:\n{path}:{err}"
 
-                if rule.rid not in self.config["rules"]["warning_filter"]:
+                if not dispatch.is_warning(rule_id):
                     LOG.error(msg, extra=flag_extra(err_labels))
                     errors = errors + 1
                 else:
@@ -97,45 +128,60 @@ class Candidate:
 
     @staticmethod
     def classify(filename, settings={}, rules=[]):  # noqa
+        candidate_type = Candidate.get_type(filename)
+        if candidate_type:
+            return candidate_type(filename, settings, rules)
+
+        return None
+
+    @staticmethod
+    def get_type(filename):
+        """
+        Return the candidate class of a file without opening it.
+
+        :param filename: Path of the file.
+        :returns: Candidate subclass or None if the file can not be classified
+
+        """
         parentdir = os.path.basename(os.path.dirname(filename))
         basename = os.path.basename(filename)
         ext = os.path.splitext(filename)[1][1:]
 
         if parentdir in ["tasks"]:
-            return Task(filename, settings, rules)
+            return Task
         if parentdir in ["handlers"]:
-            return Handler(filename, settings, rules)
+            return Handler
         if parentdir in ["vars", "defaults"]:
-            return RoleVars(filename, settings, rules)
+            return RoleVars
         if "group_vars" in filename.split(os.sep):
-            return GroupVars(filename, settings, rules)
+            return GroupVars
         if "host_vars" in filename.split(os.sep):
-            return HostVars(filename, settings, rules)
+            return HostVars
         if parentdir in ["meta"] and "main" in basename:
-            return Meta(filename, settings, rules)
+            return Meta
         if parentdir in ["meta"] and "argument_specs" in basename:
-            return ArgumentSpecs(filename, settings, rules)
+            return ArgumentSpecs
         if parentdir in [
             "library",
             "lookup_plugins",
             "callback_plugins",
             "filter_plugins",
         ] or filename.endswith(".py"):
-            return Code(filename, settings, rules)
+            return Code
         if basename == "inventory" or basename == "hosts" or parentdir in ["inventories"]:
-            return Inventory(filename, settings, rules)
+            return Inventory
         if "rolesfile" in basename or ("requirements" in basename and ext in ["yaml", "yml"]):
-            return Rolesfile(filename, settings, rules)
+            return Rolesfile
         if "Makefile" in basename:
-            return Makefile(filename, settings, rules)
+            return Makefile
         if "templates" in filename.split(os.sep) or basename.endswith(".j2"):
-            return Template(filename, settings, rules)
+            return Template
         if "files" in filename.split(os.sep):
-            return File(filename, settings, rules)
+            return File
         if basename.endswith(".yml") or basename.endswith(".yaml"):
-            return Playbook(filename, settings, rules)
+            return Playbook
         if "README" in basename:
-            return Doc(filename, settings, rules)
+            return Doc
         return None
 
     def _format_id(self, rule_id):
@@ -152,6 +198,180 @@ class Candidate:
         return self.__dict__.get(item)
 
 
+class Artifacts:
+    """
+    Lazy store for the parsed content of a single candidate.
+
+    Each artifact is built on first access and shared by all rules reviewing
+    the candidate. Syntax errors are stored as well and re-raised on every access,
+    so a faulty file is parsed only once too.
+    """
+
+    def __init__(self, candidate):
+        self.candidate = candidate
+        self.line_scanner = None
+        self._store = {}
+
+    def _get(self, key, builder):
+        if key not in self._store:
+            try:
+                self._store[key] = (builder(), None)
+            except (LaterError, LaterAnsibleError, yaml.YAMLError) as e:
+                self._store[key] = (None, e)
+
+        value, error = self._store[key]
+        if error:
+            raise error
+
+        return value
+
+    def clear(self):
+        self.line_scanner = None
+        self._store.clear()
+
+    def source(self):
+        def _build():
+            # Read without newline translation to keep line endings as they are.
+            with open(self.candidate.path, encoding="utf-8", newline="") as f:
+                return f.read()
+
+        return self._get("source", _build)
+
+    def text(self):
+        def _build():
+            return self.source().replace("\r\n", "\n").replace("\r", "\n")
+
+        return self._get("text", _build)
+
+    def normalized_yaml(self, options):
+        """
+        Return the filtered line index of the candidate as tuple of (lineno, line) tuples.
+
+        The index is built once per combination of the `remove_markers` and
+        `remove_empty` options.
+
+        :param options: Dict with optional `remove_markers` and `remove_empty` flags.
+        :returns: tuple
+
+        """
+        flags = (bool(options.get("remove_markers")), bool(options.get("remove_empty")))
+
+        def _build():
+            from ansiblelater.utils.rawyaml import normalized_lines
+
+            lines = self.source().splitlines(keepends=True)
+            return tuple(normalized_lines(lines, options))
+
+        return self._get(("normalized_yaml", *flags), _build)
+
+    def yaml(self):
+        # Parsing tasks needs the ansible YAML loader, ansible is imported on first use.
+        from ansiblelater.utils.yamlhelper import parse_yaml_linenumbers
+
+        return self._get("yaml", lambda: parse_yaml_linenumbers(self.text(), self.candidate.path))
+
+    def action_tasks(self):
+        from ansiblelater.utils.yamlhelper import action_tasks
+
+        def _build():
+            yamllines = self.yaml()
+            if not yamllines:
+                return []
+
+            return action_tasks(yamllines, self.candidate)
+
+        return self._get("action_tasks", _build)
+
+    def line_matches(self, rule):
+        """
+        Return the matches of the line patterns of a rule.
+
+        The normalized lines are scanned once for all rules of the line scanner
+        registered for the current review. Other rules are scanned on their own.
+
+        :param rule: The rule to return the matches for.
+        :returns: list
+
+        """
+        options = {"remove_empty": True, "remove_markers": True}
+
+        if self.line_scanner and rule in self.line_scanner.rules:
+            matches = self._get(
+                "line_matches", lambda: self.line_scanner.scan(self.normalized_yaml(options))
+            )
+        else:
+            matches = self._get(
+                ("line_matches", id(rule)),
+                lambda: LineScanner([rule]).scan(self.normalized_yaml(options)),
+            )
+
+        return matches[rule]
+
+    def yamllint(self):
+        def _build():
+            conf = load_yamllint_config(yamllint_options(self.candidate.config))
+            return list(linter.run(self.text(), conf))
+
+        return self._get("yamllint", _build)
+
+    def normalized_tasks(self, full=False):
+        """
+        Return the normalized action tasks as tuple of read-only mappings.
+
+        :param full: Include tasks tagged with `skip_ansible_later` or `skip_ansible_lint`.
+        :returns: tuple
+
+        """
+
+        def _build():
+            normalized = []
+            for task in self.action_tasks():
+                if not full and self._is_skipped(task):
+                    # No need to normalize_task if we are skipping it.
+                    continue
+
+                normalized.append(
+                    self._get(("normalized_task", id(task)), lambda t=task: self._normalize(t))
+                )
+
+            return tuple(normalized)
+
+        return self._get(("normalized_tasks", full), _build)
+
+    def _normalize(self, task):
+        from ansiblelater.utils.yamlhelper import normalize_task
+
+        # Normalize a copy, the action tasks are shared with other rules.
+        normalized = normalize_task(
+            copy.copy(task),
+            self.candidate.path,
+            self.candidate.config["ansible"]["custom_modules"],
+        )
+        normalized["__raw_task__"] = task
+        normalized["action"] = MappingProxyType(normalized["action"])
+
+        return MappingProxyType(normalized)
+
+    @staticmethod
+    def _is_skipped(task):
+        # An empty `tags` block causes `None` to be returned if
+        # the `or []` is not present - `task.get("tags", [])`
+        # does not suffice.
+        tags = task.get("tags") or []
+
+        # `skip_ansible_lint` is deprecated.
+        return "skip_ansible_lint" in tags or "skip_ansible_later" in tags
+
+    def raw_yaml(self):
+        from ansiblelater.utils.rawyaml import parse_raw_yaml
+
+        return self._get("raw_yaml", lambda: parse_raw_yaml(self.text()))
+
+    def __getstate__(self):
+        # parsed content is never shipped to worker processes
+        return {"candidate": self.candidate, "line_scanner": None, "_store": {}}
+
+
 class RoleFile(Candidate):
     """Object classified as Ansible role file."""
 
@@ -162,7 +382,8 @@ class RoleFile(Candidate):
         while parentdir != os.path.dirname(parentdir):
             role_modules = os.path.join(parentdir, "library")
             if os.path.exists(role_modules):
-                module_loader.add_directory(role_modules)
+                add_module_directory(role_modules)
+                self.library = role_modules
                 break
             parentdir = os.path.dirname(parentdir)
 
@@ -0,0 +1,157 @@
+"""Thin client forwarding runs to the review daemon."""
+
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+
+from ansiblelater import __version__
+
+# Environment variables that are read while ansible is imported. Runs are only
+# forwarded if the daemon was started with the same values.
+ENV_PREFIXES = ("ANSIBLE_",)
+ENV_EXCLUDE = ("ANSIBLE_LATER_SOCKET",)
+
+# Environment variables read during a run, the daemon applies them to the run.
+RUN_ENV = (
+    "PY_COLORS",
+    "TERM",
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_INDEX_FILE",
+    "GIT_OBJECT_DIRECTORY",
+    "GIT_ALTERNATE_OBJECT_DIRECTORIES",
+)
+
+
+def socket_dir():
+    """Return the private directory of the daemon socket of the current user."""
+    directory = os.environ.get("XDG_RUNTIME_DIR")
+    if directory:
+        return directory
+
+    return os.path.join(tempfile.gettempdir(), f"ansible-later-{os.getuid()}")
+
+
+def socket_path():
+    """Return the path of the daemon socket of the current user."""
+    path = os.environ.get("ANSIBLE_LATER_SOCKET")
+    if path:
+        return path
+
+    return os.path.join(socket_dir(), "ansible-later.sock")
+
+
+def is_private_dir(path):
+    """Return True if the directory is owned by the current user and not accessible by others."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def peer_uid(sock):
+    """Return the user id of the process on the other end of a unix socket or None."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+def import_env(env=None):
+    """Return the environment variables that affect how ansible is imported."""
+    env = os.environ if env is None else env
+    return {
+        key: value
+        for key, value in env.items()
+        if key.startswith(ENV_PREFIXES) and key not in ENV_EXCLUDE
+    }
+
+
+def run_env(env=None):
+    """Return the environment variables that are sent to the daemon."""
+    env = os.environ if env is None else env
+    return {**import_env(env), **{key: env[key] for key in RUN_ENV if key in env}}
+
+
+def request(argv, path=None):
+    """
+    Run ansible-later with the given arguments in the daemon.
+
+    The daemon writes directly to the stdin, stdout and stderr of this process.
+    Runs are only forwarded to a daemon of the same user, the default socket must
+    be located in a directory only accessible by the current user.
+
+    :param argv: List of command line arguments.
+    :param path: Optional path of the daemon socket.
+    :returns: exit code of the run or None if the run was not accepted by a daemon
+
+    """
+    if not all(hasattr(socket, attr) for attr in ("AF_UNIX", "send_fds", "SO_PEERCRED")):
+        return None
+
+    if path is None:
+        path = socket_path()
+        if not os.environ.get("ANSIBLE_LATER_SOCKET") and not is_private_dir(socket_dir()):
+            return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        uid = peer_uid(sock)
+    except OSError:
+        sock.close()
+        return None
+
+    if uid != os.getuid():
+        sock.close()
+        return None
+
+    payload = {
+        "version": __version__,
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "env": run_env(),
+    }
+
+    with sock:
+        try:
+            socket.send_fds(sock, [b"\0"], [0, 1, 2])
+            sock.sendall(json.dumps(payload).encode("utf-8"))
+            sock.shutdown(socket.SHUT_WR)
+
+            response = b""
+            while chunk := sock.recv(4096):
+                response += chunk
+        except OSError as e:
+            sys.stderr.write(f"Lost connection to ansible-later daemon: {e}\n")
+            return 1
+
+    try:
+        return json.loads(response)["code"]
+    except (ValueError, KeyError):
+        sys.stderr.write("Invalid response of ansible-later daemon\n")
+        return 1
+
+
+def main(argv=None):
+    """Run ansible-later in the daemon, or in this process if no daemon is running."""
+    argv = sys.argv[1:] if argv is None else argv
+
+    code = request(argv)
+    if code is None:
+        from ansiblelater.__main__ import main as later
+
+        later(argv)
+
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
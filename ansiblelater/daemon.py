@@ -0,0 +1,187 @@
+"""Review daemon serving runs from a warm process over a unix socket."""
+
+import argparse
+import contextlib
+import importlib.resources
+import json
+import os
+import signal
+import socket
+import sys
+
+import colorama
+
+from ansiblelater import LOG, __main__, __version__, client, logger, utils
+from ansiblelater.rule import SingleRules
+
+
+def warm_up():
+    """Import ansible and load the built-in rules before any run is served."""
+    ref = importlib.resources.files("ansiblelater") / "rules"
+    with importlib.resources.as_file(ref) as path:
+        SingleRules([os.path.relpath(os.path.normpath(path))])
+
+    utils.load_plugin("ansible.builtin.command")
+
+
+def config_state(path):
+    """
+    Return the path and mtime of an ansible config file.
+
+    :param path: Path of the config file or None.
+    :returns: list or None if no config file is used
+
+    """
+    if not path:
+        return None
+
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    return [os.path.abspath(path), mtime]
+
+
+class Server:
+    """
+    Accept runs from `ansible-later-client` on a unix socket.
+
+    Every run is served by a child forked from the warm server process. The child
+    takes over the standard streams and working directory of the client and the
+    environment variables read during a run, then runs the regular main program.
+    Runs that would load other `ANSIBLE_*` variables or another ansible config
+    file than the server are declined.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize a new server.
+
+        :param path: Path of the unix socket.
+        :returns: None
+
+        """
+        from ansible import constants
+
+        self.path = path
+        self.env = client.import_env()
+        self.ansible_config = config_state(constants.CONFIG_FILE)
+
+    def serve_forever(self):
+        if self.path == os.path.join(client.socket_dir(), "ansible-later.sock"):
+            os.makedirs(client.socket_dir(), mode=0o700, exist_ok=True)
+            if not client.is_private_dir(client.socket_dir()):
+                utils.sysexit_with_message(
+                    f"Socket directory {client.socket_dir()} must only be accessible by its owner"
+                )
+
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)
+        try:
+            sock.bind(self.path)
+        finally:
+            os.umask(umask)
+        sock.listen()
+
+        # Children are not waited for, let the kernel reap them.
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        LOG.info(f"Listening on {self.path}")
+
+        try:
+            while True:
+                conn, _ = sock.accept()
+                if os.fork() == 0:
+                    sock.close()
+                    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                    try:
+                        self._handle(conn)
+                    finally:
+                        os._exit(0)
+                conn.close()
+        finally:
+            sock.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+    def _handle(self, conn):
+        if client.peer_uid(conn) != os.getuid():
+            return
+
+        _, fds, _, _ = socket.recv_fds(conn, 1, 3)
+        data = b""
+        while chunk := conn.recv(65536):
+            data += chunk
+        request = json.loads(data)
+
+        if not self._compatible(request):
+            conn.sendall(json.dumps({"code": None}).encode("utf-8"))
+            return
+
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+
+        for key in client.RUN_ENV:
+            if key in request["env"]:
+                os.environ[key] = request["env"][key]
+            else:
+                os.environ.pop(key, None)
+        sys.argv = ["ansible-later", *request["argv"]]
+
+        # Decide about colored output for the client terminal.
+        colorama.deinit()
+        colorama.init(autoreset=True, strip=(not logger._should_do_markup()))
+
+        try:
+            __main__.main(request["argv"])
+            code = 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+        conn.sendall(json.dumps({"code": code}).encode("utf-8"))
+
+    def _compatible(self, request):
+        from ansible.config.manager import find_ini_config_file
+
+        if request["version"] != __version__ or client.import_env(request["env"]) != self.env:
+            return False
+
+        try:
+            os.chdir(request["cwd"])
+        except OSError:
+            return False
+
+        # Ansible reads the config file of the working directory when it is imported.
+        return config_state(find_ini_config_file()) == self.ansible_config
+
+
+def main():
+    """Run the review daemon."""
+    parser = argparse.ArgumentParser(description="Serve ansible-later runs from a warm process")
+    parser.add_argument(
+        "-s",
+        "--socket",
+        metavar="PATH",
+        default=client.socket_path(),
+        help="path of the unix socket (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    logger.update_logger(LOG, "INFO", False)
+    warm_up()
+
+    try:
+        Server(args.socket).serve_forever()
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
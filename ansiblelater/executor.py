@@ -0,0 +1,498 @@
+"""Review candidates in worker pools."""
+
+import contextlib
+import gc
+import heapq
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from ansiblelater import LOG, utils
+from ansiblelater.candidate import Candidate
+from ansiblelater.rule import SingleRules
+from ansiblelater.utils.moduleindex import ModuleIndex
+
+BACKENDS = ["auto", "serial", "thread", "process"]
+ORDERS = ["path", "completion"]
+
+# Runs with fewer candidates are reviewed in-process by the `auto` backend,
+# starting workers costs more than reviewing a handful of files.
+SERIAL_THRESHOLD = 4
+
+# Work units submitted per job, small enough units balance the load, fewer units
+# save IPC round trips.
+UNITS_PER_JOB = 4
+MAX_BATCH_SIZE = 32
+
+# Expected review duration per byte of files without recorded timings.
+DEFAULT_SECONDS_PER_BYTE = 1e-5
+
+# Modules imported once by the forkserver, so workers do not import them again.
+PRELOAD_MODULES = [
+    "ansiblelater.candidate",
+    "ansiblelater.executor",
+]
+
+# Preloaded in addition if a selected rule needs ansible.
+ANSIBLE_PRELOAD_MODULES = [
+    "ansiblelater.utils.yamlhelper",
+]
+
+
+def prepare(config):
+    """
+    Load the rules, yamllint config and module index shared by all reviews.
+
+    This is called in the main process before the executor is started and as worker
+    initializer, so workers that are not forked start with the same state. Ansible
+    itself is only imported once a rule needs it, see `prepare_ansible`.
+
+    :param config: The settings dict of the current run.
+    :returns: None
+
+    """
+    source = config["rules"]["dir"]
+    include_filter = config["rules"]["include_filter"]
+    exclude_filter = config["rules"]["exclude_filter"]
+    index_dir = config["cache"]["dir"] if config["cache"]["enabled"] else None
+
+    # Long running processes may serve runs with other rule or cache directories.
+    # Rules loaded without filters can serve any run of the same directories.
+    rules = SingleRules(source, include_filter, exclude_filter, index_dir)
+    if rules.source != [os.path.abspath(s) for s in source] or (
+        (rules.include_filter or rules.exclude_filter)
+        and (rules.include_filter, rules.exclude_filter) != (include_filter, exclude_filter)
+    ):
+        SingleRules.reset()
+        rules = SingleRules(source, include_filter, exclude_filter, index_dir)
+
+    # Built before workers are forked, so they inherit the dispatch table.
+    rules.dispatch(config["rules"])
+
+    utils.load_yamllint_config(utils.yamllint_options(config))
+
+    if ModuleIndex(index_dir).directory != (os.path.abspath(index_dir) if index_dir else None):
+        ModuleIndex.reset()
+        ModuleIndex(index_dir)
+
+
+def prepare_ansible(config):
+    """
+    Import ansible and initialize its module loader.
+
+    Worker processes are started from a process that already did this, so the
+    import is paid once and not by every worker. Runs without any selected rule
+    that needs ansible skip this.
+
+    :param config: The settings dict of the current run.
+    :returns: None
+
+    """
+    from ansiblelater.utils.yamlhelper import install_custom_modules
+
+    install_custom_modules(config["ansible"]["custom_modules"])
+    utils.load_plugin("ansible.builtin.command")
+
+
+def _prepare_worker(config, needs_ansible):
+    prepare(config)
+    if needs_ansible:
+        prepare_ansible(config)
+
+
+def _gil_enabled():
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled() if is_gil_enabled else True
+
+
+def select_backend(backend, jobs, count):
+    """
+    Return the executor backend to use for a run.
+
+    The `auto` backend reviews small runs in-process, uses threads on free-threaded
+    Python builds and worker processes otherwise.
+
+    :param backend: Configured backend name.
+    :param jobs: Number of parallel jobs.
+    :param count: Number of candidates to review.
+    :returns: str
+
+    """
+    if backend != "auto":
+        return backend
+
+    if jobs <= 1 or count < SERIAL_THRESHOLD:
+        return "serial"
+
+    return "process" if _gil_enabled() else "thread"
+
+
+def create_executor(backend, jobs, config):
+    """
+    Start the executor of the given backend from the prepared main process.
+
+    :param backend: One of `serial`, `thread` or `process`.
+    :param jobs: Number of workers.
+    :param config: The settings dict of the current run.
+    :returns: concurrent.futures.Executor or None for in-process reviews
+
+    """
+    if backend == "serial":
+        return None
+
+    if backend == "thread":
+        return ThreadPoolExecutor(
+            jobs, thread_name_prefix="later", initializer=prepare, initargs=(config,)
+        )
+
+    preload = PRELOAD_MODULES
+    needs_ansible = SingleRules(config["rules"]["dir"]).dispatch(config["rules"]).needs_ansible
+    if needs_ansible:
+        prepare_ansible(config)
+        preload = PRELOAD_MODULES + ANSIBLE_PRELOAD_MODULES
+
+    context = multiprocessing.get_context()
+    if context.get_start_method() == "forkserver":
+        context.set_forkserver_preload(preload)
+
+    # Frozen objects are skipped by the garbage collector, forked workers keep
+    # sharing their pages copy-on-write instead of touching them on collection.
+    gc.freeze()
+    try:
+        pool = ProcessPoolExecutor(
+            jobs,
+            mp_context=context,
+            initializer=_prepare_worker,
+            initargs=(config, needs_ansible),
+        )
+        # Forked workers are all started by the first submit.
+        pool.submit(int)
+        return pool
+    finally:
+        gc.unfreeze()
+
+
+class Timings:
+    """
+    Estimate the review cost of files.
+
+    Durations of previous runs are used if available, otherwise the file size is
+    converted to an expected duration. If a directory is given, the durations of
+    the current run are stored there for the next one.
+    """
+
+    def __init__(self, directory=None):
+        """
+        Initialize the timings.
+
+        :param directory: Optional directory to persist the timings in.
+        :returns: None
+
+        """
+        self.durations = {}
+        self.path = os.path.join(directory, "timings.json") if directory else None
+
+        if self.path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.durations = {path: float(duration) for path, duration in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            LOG.debug(f"Ignoring timings {self.path}: {e}")
+
+    def _rate(self):
+        """Return the review duration per byte observed in previous runs."""
+        seconds = 0.0
+        size = 0
+        for path, duration in self.durations.items():
+            with contextlib.suppress(OSError):
+                size += os.path.getsize(path)
+                seconds += duration
+
+        return seconds / size if seconds and size else DEFAULT_SECONDS_PER_BYTE
+
+    def estimate(self, candidates):
+        """
+        Return the expected review duration of each candidate.
+
+        :param candidates: List of candidates.
+        :returns: list of durations in seconds
+
+        """
+        rate = None
+        costs = []
+        for candidate in candidates:
+            if candidate.path in self.durations:
+                costs.append(self.durations[candidate.path])
+                continue
+
+            if rate is None:
+                rate = self._rate()
+            try:
+                costs.append(os.path.getsize(candidate.path) * rate)
+            except OSError:
+                costs.append(0.0)
+
+        return costs
+
+    def update(self, path, duration):
+        self.durations[path] = duration
+
+    def save(self):
+        """Store the known durations of existing files."""
+        if not self.path:
+            return
+
+        durations = {
+            path: round(duration, 6)
+            for path, duration in self.durations.items()
+            if os.path.exists(path)
+        }
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(durations, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            LOG.debug(f"Failed to write timings {self.path}: {e}")
+
+
+def schedule(costs, jobs, ordered=False):
+    """
+    Group candidates into work units.
+
+    Expensive candidates get a unit on their own, cheap candidates are batched until
+    a unit reaches the target cost to save the per unit IPC overhead. The most
+    expensive units start first, so they do not dominate the end of the run.
+    Ordered units only batch neighbouring candidates and keep the candidate order,
+    except for up to one expensive unit per job that still starts first. The
+    remaining units are released as soon as they are reviewed.
+
+    :param costs: Expected review duration of each candidate.
+    :param jobs: Number of parallel jobs.
+    :param ordered: Keep the candidate order for all but the most expensive units.
+    :returns: list of lists of candidate indices
+
+    """
+    target = sum(costs) / (jobs * UNITS_PER_JOB)
+    units = []
+    batch = []
+    batch_cost = 0.0
+
+    indices = range(len(costs))
+    if not ordered:
+        indices = sorted(indices, key=lambda i: costs[i], reverse=True)
+
+    for index in indices:
+        if costs[index] >= target:
+            if ordered and batch:
+                units.append(batch)
+                batch = []
+                batch_cost = 0.0
+            units.append([index])
+            continue
+
+        batch.append(index)
+        batch_cost += costs[index]
+        if batch_cost >= target or len(batch) >= MAX_BATCH_SIZE:
+            units.append(batch)
+            batch = []
+            batch_cost = 0.0
+
+    if batch:
+        units.append(batch)
+
+    if ordered:
+        # One unit per job at most, so the window always has room for the unit
+        # holding the next result to release.
+        first = sorted(
+            (unit for unit in units if costs[unit[0]] >= target),
+            key=lambda unit: costs[unit[0]],
+            reverse=True,
+        )[:jobs]
+        units = first + [unit for unit in units if unit not in first]
+
+    return units
+
+
+def review(pool, candidates, jobs, order="path", timings=None):
+    """
+    Review candidates in an executor and yield their results as soon as they can be reported.
+
+    Candidates are submitted in work units scheduled by their expected cost. At most
+    `jobs * UNITS_PER_JOB` units are in flight or waiting to be released at any time,
+    so memory stays bounded. Results are released in path order or in the order the
+    reviews complete. In path order the units are submitted in path order as well,
+    except for the most expensive ones, see `schedule`.
+
+    :param pool: A `concurrent.futures.Executor` or None to review all candidates
+        in-process.
+    :param candidates: List of candidates to review.
+    :param jobs: Number of parallel jobs.
+    :param order: Either `path` or `completion`.
+    :param timings: Optional `Timings` object to estimate costs and record durations.
+    :returns: generator of (candidate, results) tuples
+
+    """
+    if order == "path":
+        candidates = sorted(candidates, key=lambda c: c.path)
+
+    if timings is None:
+        timings = Timings()
+
+    if pool is None:
+        for candidate in candidates:
+            _, results, duration = _collect_one(0, candidate)
+            if duration is not None:
+                timings.update(candidate.path, duration)
+            yield candidate, results
+        return
+
+    units = iter(schedule(timings.estimate(candidates), jobs, ordered=order == "path"))
+    window = jobs * UNITS_PER_JOB
+    futures = set()
+    # Heap of the last candidate index of every submitted unit not released yet.
+    open_units = []
+
+    def _submit():
+        while len(open_units) < window:
+            unit = next(units, None)
+            if unit is None:
+                break
+            futures.add(pool.submit(_collect, [(index, candidates[index]) for index in unit]))
+            heapq.heappush(open_units, max(unit))
+
+    pending = {}
+    position = 0
+
+    try:
+        _submit()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            futures -= done
+            reviewed = [item for future in done for item in future.result()]
+
+            for index, results, duration in reviewed:
+                if duration is not None:
+                    timings.update(candidates[index].path, duration)
+
+                if order == "completion":
+                    yield candidates[index], results
+                else:
+                    pending[index] = results
+
+            if order == "completion":
+                for _ in done:
+                    heapq.heappop(open_units)
+
+            while position in pending:
+                yield candidates[position], pending.pop(position)
+                position += 1
+
+            while order == "path" and open_units and open_units[0] < position:
+                heapq.heappop(open_units)
+
+            _submit()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _collect_one(index, candidate):
+    start = time.perf_counter()
+    results = candidate.collect()
+    duration = time.perf_counter() - start
+
+    # Replayed results say nothing about the cost of a review.
+    if getattr(candidate, "cached", False):
+        duration = None
+
+    return index, results, duration
+
+
+def _collect(unit):
+    return [_collect_one(index, candidate) for index, candidate in unit]
+
+
+def run(settings, files=None):
+    """
+    Classify and review files and report their errors.
+
+    :param settings: The `Settings` object of the current run.
+    :param files: Optional list of files to review, defaults to all discovered files.
+    :returns: number of reported errors
+
+    """
+    config = settings.config
+
+    backend = config["executor"]["backend"]
+    if backend not in BACKENDS:
+        utils.sysexit_with_message(
+            f"Invalid executor backend '{backend}', expected one of: {', '.join(BACKENDS)}"
+        )
+
+    order = config["executor"]["order"]
+    if order not in ORDERS:
+        utils.sysexit_with_message(
+            f"Invalid executor order '{order}', expected one of: {', '.join(ORDERS)}"
+        )
+
+    jobs = config["executor"]["jobs"]
+    if jobs < 0:
+        utils.sysexit_with_message(f"Invalid number of jobs '{jobs}'")
+
+    dispatch = SingleRules(config["rules"]["dir"]).dispatch(config["rules"])
+
+    tasks = []
+    for filename in config["rules"]["files"] if files is None else files:
+        candidate_type = Candidate.get_type(filename)
+        if not candidate_type:
+            LOG.info(f"Couldn't classify file {filename}")
+            continue
+
+        # Files without any applicable rule are neither opened nor reviewed.
+        kind = candidate_type.__name__.lower()
+        if not dispatch.rules(kind):
+            LOG.info(f"Not reviewing {kind} file {filename}, no rules apply")
+            continue
+
+        candidate = candidate_type(filename, settings)
+        if candidate.binary:
+            LOG.info(f"Not reviewing binary file {filename}")
+            continue
+        if candidate.vault:
+            LOG.info(f"Not reviewing vault file {filename}")
+            continue
+
+        LOG.info(f"Reviewing all of {candidate}")
+        tasks.append(candidate)
+
+    workers = max(min(jobs or utils.default_jobs(), len(tasks)), 1)
+    backend = select_backend(backend, workers, len(tasks))
+    pool = create_executor(backend, workers, config)
+
+    timings = Timings(config["cache"]["dir"] if config["cache"]["enabled"] else None)
+
+    errors = 0
+    try:
+        for candidate, results in review(pool, tasks, workers, order, timings):
+            if settings.changes is not None:
+                results = settings.changes.filter(candidate.path, results)
+            errors += candidate.report(results)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    timings.save()
+
+    return errors
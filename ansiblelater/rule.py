@@ -1,30 +1,24 @@
 """Rule definition."""
 
 import copy
-import importlib
+import hashlib
+import importlib.util
 import inspect
 import os
 import pathlib
 import re
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict
+from types import MappingProxyType
 from urllib.parse import urlparse
 
 import toolz
 import yaml
 from yamllint import linter
-from yamllint.config import YamlLintConfig
 
 from ansiblelater.exceptions import LaterAnsibleError, LaterError
-from ansiblelater.utils import Singleton, sysexit_with_message
-from ansiblelater.utils.yamlhelper import (
-    UnsafeTag,
-    VaultTag,
-    action_tasks,
-    normalize_task,
-    normalized_yaml,
-    parse_yaml_linenumbers,
-)
+from ansiblelater.utils import Singleton, load_yamllint_config, sysexit_with_message
+from ansiblelater.utils.ruleindex import RuleIndex
 
 
 class RuleMeta(type):
@@ -34,6 +28,7 @@ class RuleMeta(type):
         mcls.description = getattr(cls, "description", "__unknown__")
         mcls.helptext = getattr(cls, "helptext", "")
         mcls.types = getattr(cls, "types", [])
+        mcls.tags = getattr(cls, "tags", [])
         return mcls
 
 
@@ -44,6 +39,14 @@ class RuleExtendedMeta(RuleMeta, ABCMeta):
 class RuleBase(metaclass=RuleExtendedMeta):
     SHELL_PIPE_CHARS = "&|<>;$\n*[]{}?"
 
+    # Patterns matched against the normalized lines by the shared line scan,
+    # see `get_line_matches`.
+    line_patterns = ()
+
+    # Rules reviewing tasks need ansible to parse them, worker processes only
+    # import it up front if a selected rule does.
+    needs_ansible = False
+
     @property
     @abstractmethod
     def rid(self):
@@ -63,8 +66,7 @@ class RuleBase(metaclass=RuleExtendedMeta):
 
         if not candidate.faulty:
             try:
-                with open(candidate.path, encoding="utf-8") as f:
-                    yamllines = parse_yaml_linenumbers(f, candidate.path)
+                yamllines = candidate.artifacts.yaml()
             except LaterError as ex:
                 e = ex.original
                 errors.append(
@@ -84,11 +86,7 @@ class RuleBase(metaclass=RuleExtendedMeta):
 
         if not candidate.faulty:
             try:
-                with open(candidate.path, encoding="utf-8") as f:
-                    yamllines = parse_yaml_linenumbers(f, candidate.path)
-
-                if yamllines:
-                    tasks = action_tasks(yamllines, candidate)
+                tasks = candidate.artifacts.action_tasks()
             except LaterError as ex:
                 e = ex.original
                 errors.append(
@@ -103,6 +101,8 @@ class RuleBase(metaclass=RuleExtendedMeta):
 
     @staticmethod
     def get_normalized_task(task, candidate, settings):
+        from ansiblelater.utils.yamlhelper import normalize_task
+
         normalized = None
         errors = []
 
@@ -124,38 +124,13 @@ class RuleBase(metaclass=RuleExtendedMeta):
         return normalized, errors
 
     @staticmethod
-    def get_normalized_tasks(candidate, settings, full=False):
+    def get_normalized_tasks(candidate, settings, full=False):  # noqa
         normalized = []
         errors = []
 
         if not candidate.faulty:
             try:
-                with open(candidate.path, encoding="utf-8") as f:
-                    yamllines = parse_yaml_linenumbers(f, candidate.path)
-
-                if yamllines:
-                    tasks = action_tasks(yamllines, candidate)
-                    for task in tasks:
-                        # An empty `tags` block causes `None` to be returned if
-                        # the `or []` is not present - `task.get("tags", [])`
-                        # does not suffice.
-
-                        # Deprecated.
-                        if "skip_ansible_lint" in (task.get("tags") or []) and not full:
-                            # No need to normalize_task if we are skipping it.
-                            continue
-
-                        if "skip_ansible_later" in (task.get("tags") or []) and not full:
-                            # No need to normalize_task if we are skipping it.
-                            continue
-
-                        normalized_task = normalize_task(
-                            task, candidate.path, settings["ansible"]["custom_modules"]
-                        )
-                        normalized_task["__raw_task__"] = task
-
-                        normalized.append(normalized_task)
-
+                normalized = list(candidate.artifacts.normalized_tasks(full=full))
             except LaterError as ex:
                 e = ex.original
                 errors.append(
@@ -180,7 +155,7 @@ class RuleBase(metaclass=RuleExtendedMeta):
                 options.update(remove_markers=True)
 
             try:
-                yamllines = normalized_yaml(candidate.path, options)
+                yamllines = list(candidate.artifacts.normalized_yaml(options))
             except LaterError as ex:
                 e = ex.original
                 errors.append(
@@ -193,6 +168,34 @@ class RuleBase(metaclass=RuleExtendedMeta):
 
         return yamllines, errors
 
+    def get_line_matches(self, candidate, settings):  # noqa
+        """
+        Return the matches of the rule's `line_patterns` in the normalized lines.
+
+        The lines of a candidate are scanned only once for the patterns of all rules.
+        Matches are returned as one list per pattern, each containing `(lineno, found)`
+        tuples for lines with at least one match, `found` being the `findall` result.
+
+        :param candidate: The candidate to check.
+        :param settings: The settings dict of the current run.
+        :returns: list
+
+        """
+        matches = [[] for _ in self.line_patterns]
+        errors = []
+
+        if not candidate.faulty:
+            try:
+                matches = candidate.artifacts.line_matches(self)
+            except LaterError as ex:
+                e = ex.original
+                errors.append(
+                    RuleBase.Error(e.problem_mark.line + 1, f"syntax error: {e.problem}")
+                )
+                candidate.faulty = True
+
+        return matches, errors
+
     @staticmethod
     def get_raw_yaml(candidate, settings):  # noqa
         content = None
@@ -200,14 +203,7 @@ class RuleBase(metaclass=RuleExtendedMeta):
 
         if not candidate.faulty:
             try:
-                with open(candidate.path, encoding="utf-8") as f:
-                    yaml.add_constructor(
-                        UnsafeTag.yaml_tag, UnsafeTag.yaml_constructor, Loader=yaml.SafeLoader
-                    )
-                    yaml.add_constructor(
-                        VaultTag.yaml_tag, VaultTag.yaml_constructor, Loader=yaml.SafeLoader
-                    )
-                    content = yaml.safe_load(f)
+                content = candidate.artifacts.raw_yaml()
             except yaml.YAMLError as e:
                 errors.append(
                     RuleBase.Error(e.problem_mark.line + 1, f"syntax error: {e.problem}")
@@ -223,7 +219,39 @@ class RuleBase(metaclass=RuleExtendedMeta):
         if not candidate.faulty:
             try:
                 with open(candidate.path, encoding="utf-8") as f:
-                    for problem in linter.run(f, YamlLintConfig(options)):
+                    for problem in linter.run(f, load_yamllint_config(options)):
+                        errors.append(RuleBase.Error(problem.line, problem.desc))
+            except yaml.YAMLError as e:
+                errors.append(
+                    RuleBase.Error(e.problem_mark.line + 1, f"syntax error: {e.problem}")
+                )
+                candidate.faulty = True
+            except (TypeError, ValueError) as e:
+                errors.append(RuleBase.Error(None, f"yamllint error: {e}"))
+                candidate.faulty = True
+
+        return errors
+
+    @staticmethod
+    def get_yamllint_errors(candidate, settings, rule):  # noqa
+        """
+        Return the problems reported by a yamllint rule.
+
+        All yamllint rules configured in `settings["yamllint"]` are checked in a single
+        pass per candidate. Syntax errors are returned for every rule.
+
+        :param candidate: The candidate to check.
+        :param settings: The settings dict of the current run.
+        :param rule: Name of the yamllint rule, e.g. `colons`.
+        :returns: list
+
+        """
+        errors = []
+
+        if not candidate.faulty:
+            try:
+                for problem in candidate.artifacts.yamllint():
+                    if problem.rule is None or problem.rule == rule:
                         errors.append(RuleBase.Error(problem.line, problem.desc))
             except yaml.YAMLError as e:
                 errors.append(
@@ -291,6 +319,23 @@ class RuleBase(metaclass=RuleExtendedMeta):
                 result[key] = value
             return result
 
+    class LinePattern:
+        """Pattern for the shared line scan."""
+
+        def __init__(self, pattern, literal=None, skip_unsafe=False):
+            """
+            Initialize a new line pattern.
+
+            :param pattern: Regular expression as string or compiled pattern
+            :param literal: Optional substring every matching line must contain, lines without
+                it are skipped without running the regular expression
+            :param skip_unsafe: Skip lines containing the `!unsafe` tag
+
+            """
+            self.regex = re.compile(pattern)
+            self.literal = literal
+            self.skip_unsafe = skip_unsafe
+
     class Result:
         """Generic result object."""
 
@@ -302,41 +347,225 @@ class RuleBase(metaclass=RuleExtendedMeta):
             return "\n".join([f"{self.candidate}:{error}" for error in self.errors])
 
 
+class LineScanner:
+    """Scan lines once for the line patterns of multiple rules."""
+
+    def __init__(self, rules):
+        self.rules = [rule for rule in rules if rule.line_patterns]
+        self.patterns = [
+            (rule, index, pattern)
+            for rule in self.rules
+            for index, pattern in enumerate(rule.line_patterns)
+        ]
+
+    def scan(self, lines):
+        """
+        Match all registered patterns against the given lines.
+
+        :param lines: Iterable of `(lineno, line)` tuples.
+        :returns: dict mapping each rule to its list of matches per pattern
+
+        """
+        matches = {rule: [[] for _ in rule.line_patterns] for rule in self.rules}
+
+        for i, line in lines:
+            unsafe = "!unsafe" in line
+
+            for rule, index, pattern in self.patterns:
+                if pattern.literal and pattern.literal not in line:
+                    continue
+                if pattern.skip_unsafe and unsafe:
+                    continue
+
+                found = pattern.regex.findall(line)
+                if found:
+                    matches[rule][index].append((i, found))
+
+        return matches
+
+
+def _matches(rid, tags, patterns):
+    return rid in patterns or not patterns.isdisjoint(tags)
+
+
+def is_selected(rid, tags, include_filter, exclude_filter):
+    """
+    Return True if a rule passes the include and exclude filters.
+
+    Filters match the rule id or any of the rule tags.
+
+    :param rid: The rule id.
+    :param tags: List of rule tags.
+    :param include_filter: Rule ids or tags to limit the rules to, all rules if empty.
+    :param exclude_filter: Rule ids or tags to exclude.
+    :returns: bool
+
+    """
+    if include_filter and not _matches(rid, tags, frozenset(include_filter)):
+        return False
+
+    return not _matches(rid, tags, frozenset(exclude_filter))
+
+
+class RuleDispatch:
+    """
+    Immutable mapping of candidate kinds to the rules applicable to them.
+
+    The rules of each kind keep the order they were loaded in and share one line
+    scanner.
+    """
+
+    def __init__(self, rules, include_filter=(), exclude_filter=(), warning_filter=()):
+        """
+        Build the dispatch table of the selected rules.
+
+        :param rules: List of loaded rules.
+        :param include_filter: Rule ids or tags to limit the rules to, all rules if empty.
+        :param exclude_filter: Rule ids or tags to exclude.
+        :param warning_filter: Rule ids or tags to report as warnings.
+        :returns: None
+
+        """
+        kinds = defaultdict(list)
+        warnings = set(warning_filter)
+        warning_filter = frozenset(warning_filter)
+
+        for rule in rules:
+            if not is_selected(rule.rid, rule.tags, include_filter, exclude_filter):
+                continue
+
+            for kind in dict.fromkeys(rule.types):
+                kinds[kind].append(rule)
+            if _matches(rule.rid, rule.tags, warning_filter):
+                warnings.add(rule.rid)
+
+        self.kinds = MappingProxyType({kind: tuple(found) for kind, found in kinds.items()})
+        self.scanners = MappingProxyType(
+            {kind: LineScanner(found) for kind, found in self.kinds.items()}
+        )
+        self.warnings = frozenset(warnings)
+        self.needs_ansible = any(
+            rule.needs_ansible for found in self.kinds.values() for rule in found
+        )
+
+    def rules(self, kind):
+        """Return the rules applicable to candidates of the given kind."""
+        return self.kinds.get(kind, ())
+
+    def line_scanner(self, kind):
+        """Return the line scanner of the rules applicable to the given kind."""
+        return self.scanners.get(kind) or LineScanner(())
+
+    def is_warning(self, rid):
+        return rid in self.warnings
+
+
 class RulesLoader:
-    def __init__(self, source):
+    def __init__(self, source, include_filter=None, exclude_filter=None, index_dir=None):
         self.rules = []
+        self.source = [os.path.abspath(s) for s in source]
+        self.include_filter = list(include_filter or [])
+        self.exclude_filter = list(exclude_filter or [])
+        self.rids = []
+        self._dispatch = {}
+        checksum = hashlib.sha256()
 
         for s in source:
+            index = RuleIndex(s, index_dir)
+
             for p in pathlib.Path(s).glob("*.py"):
                 filename = os.path.splitext(os.path.basename(p))[0]
                 if not re.match(r"^[A-Za-z]+$", filename):
                     continue
 
-                spec = importlib.util.spec_from_file_location(filename, p)
-                module = importlib.util.module_from_spec(spec)
+                module = None
+                instances = {}
+                entry = index.get(p)
+                if entry is None:
+                    digest = hashlib.sha256(p.read_bytes()).hexdigest()
+                    module = self._load_module(filename, p)
+                    instances = self._get_rules(module)
+                    entry = index.set(
+                        p,
+                        digest,
+                        [
+                            {"name": name, "rid": rule.rid, "types": rule.types, "tags": rule.tags}
+                            for name, rule in instances.items()
+                        ],
+                    )
+
+                checksum.update(filename.encode("utf-8"))
+                checksum.update(bytes.fromhex(entry["digest"]))
+                self.rids.extend(rule["rid"] for rule in entry["rules"])
 
-                try:
-                    spec.loader.exec_module(module)
-                except (ImportError, NameError) as e:
-                    sysexit_with_message(f"Failed to load roles file {filename}: \n {e!s}")
+                # Modules without any selected rule are not imported.
+                names = [
+                    rule["name"]
+                    for rule in entry["rules"]
+                    if is_selected(
+                        rule["rid"], rule["tags"], self.include_filter, self.exclude_filter
+                    )
+                ]
+                if names and module is None:
+                    module = self._load_module(filename, p)
+                    instances = self._get_rules(module)
+
+                self.rules.extend(instances[name] for name in names)
 
-                try:
-                    for _name, obj in inspect.getmembers(module):
-                        if self._is_plugin(obj):
-                            self.rules.append(obj())
-                except TypeError as e:
-                    sysexit_with_message(f"Failed to load roles file: \n {e!s}")
+            index.save()
 
+        self.checksum = checksum.hexdigest()
         self.validate()
 
+    @staticmethod
+    def _load_module(filename, path):
+        spec = importlib.util.spec_from_file_location(filename, path)
+        module = importlib.util.module_from_spec(spec)
+
+        try:
+            spec.loader.exec_module(module)
+        except (ImportError, NameError) as e:
+            sysexit_with_message(f"Failed to load roles file {filename}: \n {e!s}")
+
+        return module
+
+    def _get_rules(self, module):
+        try:
+            return {
+                name: obj() for name, obj in inspect.getmembers(module) if self._is_plugin(obj)
+            }
+        except TypeError as e:
+            sysexit_with_message(f"Failed to load roles file: \n {e!s}")
+
     def _is_plugin(self, obj):
         return (
             inspect.isclass(obj) and issubclass(obj, RuleBase) and obj is not RuleBase and not None
         )
 
+    def dispatch(self, config):
+        """
+        Return the dispatch table for the rule settings of a run.
+
+        Tables are built once per process and settings, so the rules of a
+        candidate are looked up instead of filtered for every file.
+
+        :param config: The `rules` settings dict.
+        :returns: RuleDispatch
+
+        """
+        key = (
+            tuple(config["include_filter"]),
+            tuple(config["exclude_filter"]),
+            tuple(config["warning_filter"]),
+        )
+        if key not in self._dispatch:
+            self._dispatch[key] = RuleDispatch(self.rules, *key)
+
+        return self._dispatch[key]
+
     def validate(self):
-        normalize_rule = list(toolz.remove(lambda x: x.rid == "", self.rules))
-        unique_rule = len(list(toolz.unique(normalize_rule, key=lambda x: x.rid)))
+        normalize_rule = list(toolz.remove(lambda x: x == "", self.rids))
+        unique_rule = len(list(toolz.unique(normalize_rule)))
         all_rules = len(normalize_rule)
         if all_rules != unique_rule:
             sysexit_with_message(
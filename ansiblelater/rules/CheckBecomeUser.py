@@ -6,6 +6,7 @@ class CheckBecomeUser(RuleBase):
     description = "Become should be combined with become_user"
     helptext = "the task has `become` enabled but `become_user` is missing"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
@@ -1,5 +1,3 @@
-import re
-
 from ansiblelater.rule import RuleBase
 from ansiblelater.utils import count_spaces
 
@@ -9,37 +7,28 @@ class CheckBracesSpaces(RuleBase):
     description = "YAML should use consistent number of spaces around variables"
     helptext = "no suitable numbers of spaces (min: {min} max: {max})"
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars", "meta"]
+    line_patterns = [RuleBase.LinePattern("{{(.*?)}}", literal="{{", skip_unsafe=True)]
 
     def check(self, candidate, settings):
-        yamllines, errors = self.get_normalized_yaml(candidate, settings)
+        line_matches, errors = self.get_line_matches(candidate, settings)
         conf = settings["ansible"]["double-braces"]
 
-        matches = []
-        braces = re.compile("{{(.*?)}}")
-
         if not errors:
-            for i, line in yamllines:
-                if "!unsafe" in line:
-                    continue
-                match = braces.findall(line)
-                if match:
-                    for item in match:
-                        matches.append((i, item))
-
-            for i, line in matches:
-                [leading, trailing] = count_spaces(line)
-                sum_spaces = leading + trailing
-
-                if (
-                    sum_spaces < conf["min-spaces-inside"] * 2
-                    or sum_spaces > conf["min-spaces-inside"] * 2
-                ):
-                    errors.append(
-                        self.Error(
-                            i,
-                            self.helptext.format(
-                                min=conf["min-spaces-inside"], max=conf["max-spaces-inside"]
-                            ),
+            for i, match in line_matches[0]:
+                for line in match:
+                    [leading, trailing] = count_spaces(line)
+                    sum_spaces = leading + trailing
+
+                    if (
+                        sum_spaces < conf["min-spaces-inside"] * 2
+                        or sum_spaces > conf["min-spaces-inside"] * 2
+                    ):
+                        errors.append(
+                            self.Error(
+                                i,
+                                self.helptext.format(
+                                    min=conf["min-spaces-inside"], max=conf["max-spaces-inside"]
+                                ),
+                            )
                         )
-                    )
         return self.Result(candidate.path, errors)
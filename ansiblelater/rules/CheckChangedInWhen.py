@@ -26,6 +26,7 @@ class CheckChangedInWhen(RuleBase):
     description = "Use handlers instead of `when: changed`"
     helptext = "tasks using `when: result.changed` setting are effectively acting as a handler"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
@@ -9,6 +9,7 @@ class CheckCommandHasChanges(RuleBase):
         "idempotent while using controls like `creates`, `removes` or `when`"
     )
     types = ["playbook", "task"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
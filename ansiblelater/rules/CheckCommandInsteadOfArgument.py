@@ -28,6 +28,7 @@ class CheckCommandInsteadOfArgument(RuleBase):
     description = "Commands should not be used in place of module arguments"
     helptext = "{exec} used in place of file modules argument {arg}"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
@@ -8,6 +8,7 @@ class CheckCommandInsteadOfModule(RuleBase):
     description = "Commands should not be used in place of modules"
     helptext = "{exec} command used in place of {module} module"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
@@ -9,26 +9,33 @@ class CheckCompareToEmptyString(RuleBase):
     description = 'Don\'t compare to empty string ""'
     helptext = "use `when: var` rather than `when: var !=` (or conversely `when: not var`)"
     types = ["playbook", "task", "handler", "template"]
+    line_patterns = [RuleBase.LinePattern("[=!]= ?[\"'][\"']", literal="=")]
 
     def check(self, candidate, settings):
-        yamllines, errors = self.get_normalized_yaml(candidate, settings)
+        if not isinstance(candidate, Template):
+            line_matches, errors = self.get_line_matches(candidate, settings)
 
-        if not errors:
-            if isinstance(candidate, Template):
-                matches = []
-                jinja_string = re.compile("({{|{%)(.*?)(}}|%})")
+            if not errors:
+                for i, _ in line_matches[0]:
+                    errors.append(self.Error(i, self.helptext))
 
-                for i, line in yamllines:
-                    match = jinja_string.findall(line)
-                    if match:
-                        for item in match:
-                            matches.append((i, item[1]))
+            return self.Result(candidate.path, errors)
 
-                yamllines = matches
+        yamllines, errors = self.get_normalized_yaml(candidate, settings)
 
-            empty_string_compare = re.compile("[=!]= ?[\"'][\"']")
+        if not errors:
+            matches = []
+            jinja_string = re.compile("({{|{%)(.*?)(}}|%})")
 
             for i, line in yamllines:
+                match = jinja_string.findall(line)
+                if match:
+                    for item in match:
+                        matches.append((i, item[1]))
+
+            empty_string_compare = self.line_patterns[0].regex
+
+            for i, line in matches:
                 if empty_string_compare.findall(line):
                     errors.append(self.Error(i, self.helptext))
 
@@ -9,26 +9,33 @@ class CheckCompareToLiteralBool(RuleBase):
     description = "Don't compare to True or False"
     helptext = "use `when: var` rather than `when: var == True` (or conversely `when: not var`)"
     types = ["playbook", "task", "handler"]
+    line_patterns = [RuleBase.LinePattern("[=!]= ?(True|true|False|false)", literal="=")]
 
     def check(self, candidate, settings):
-        yamllines, errors = self.get_normalized_yaml(candidate, settings)
+        if not isinstance(candidate, Template):
+            line_matches, errors = self.get_line_matches(candidate, settings)
 
-        if not errors:
-            if isinstance(candidate, Template):
-                matches = []
-                jinja_string = re.compile("({{|{%)(.*?)(}}|%})")
+            if not errors:
+                for i, _ in line_matches[0]:
+                    errors.append(self.Error(i, self.helptext))
 
-                for i, line in yamllines:
-                    match = jinja_string.findall(line)
-                    if match:
-                        for item in match:
-                            matches.append((i, item[1]))
+            return self.Result(candidate.path, errors)
 
-                yamllines = matches
+        yamllines, errors = self.get_normalized_yaml(candidate, settings)
 
-            literal_bool_compare = re.compile("[=!]= ?(True|true|False|false)")
+        if not errors:
+            matches = []
+            jinja_string = re.compile("({{|{%)(.*?)(}}|%})")
 
             for i, line in yamllines:
+                match = jinja_string.findall(line)
+                if match:
+                    for item in match:
+                        matches.append((i, item[1]))
+
+            literal_bool_compare = self.line_patterns[0].regex
+
+            for i, line in matches:
                 if literal_bool_compare.findall(line):
                     errors.append(self.Error(i, self.helptext))
 
@@ -6,6 +6,7 @@ class CheckDeprecated(RuleBase):
     description = "Deprecated features should not be used"
     helptext = "`{old}` is deprecated and should not be used anymore. Use `{new}` instead."
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings, full=True)
@@ -32,11 +32,12 @@ class CheckDeprecatedBareVars(RuleBase):
         "or be converted to a list"
     )
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
-        tasks, self.errors = self.get_normalized_tasks(candidate, settings)
+        tasks, errors = self.get_normalized_tasks(candidate, settings)
 
-        if not self.errors:
+        if not errors:
             for task in tasks:
                 loop_type = next((key for key in task if key.startswith("with_")), None)
 
@@ -59,17 +60,17 @@ class CheckDeprecatedBareVars(RuleBase):
                     if not isinstance(items, (list, tuple)):
                         items = [items]
                     for var in items:
-                        self._matchvar(var, task, loop_type)
+                        self._matchvar(var, task, loop_type, errors)
                 elif loop_type == "with_subelements":
-                    self._matchvar(task[loop_type][0], task, loop_type)
+                    self._matchvar(task[loop_type][0], task, loop_type, errors)
                 elif loop_type in ["with_sequence", "with_ini", "with_inventory_hostnames"]:
                     pass
                 else:
-                    self._matchvar(task[loop_type], task, loop_type)
+                    self._matchvar(task[loop_type], task, loop_type, errors)
 
-        return self.Result(candidate.path, self.errors)
+        return self.Result(candidate.path, errors)
 
-    def _matchvar(self, varstring, task, loop_type):
+    def _matchvar(self, varstring, task, loop_type, errors):
         if isinstance(varstring, str) and not has_jinja(varstring):
             valid = loop_type == "with_fileglob" and bool(
                 has_jinja(varstring) or has_glob(varstring),
@@ -79,7 +80,7 @@ class CheckDeprecatedBareVars(RuleBase):
                 has_jinja(varstring) or varstring.endswith(os.sep),
             )
             if not valid:
-                self.errors.append(
+                errors.append(
                     self.Error(
                         task["__line__"],
                         self.helptext.format(barevar=varstring, loop_type=loop_type),
@@ -1,7 +1,7 @@
 # Original code written by the authors of ansible-lint
 
 from ansiblelater.rule import RuleBase
-from ansiblelater.utils import load_plugin
+from ansiblelater.utils.moduleindex import ModuleIndex
 
 
 class CheckFQCNBuiltin(RuleBase):
@@ -9,6 +9,7 @@ class CheckFQCNBuiltin(RuleBase):
     helptext = "use FQCN `{module_alias}` for module action `{module}`"
     description = "Module actions should use full qualified collection names"
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars"]
+    needs_ansible = True
     module_aliases = {"block/always/rescue": "block/always/rescue"}
 
     def check(self, candidate, settings):
@@ -91,20 +92,21 @@ class CheckFQCNBuiltin(RuleBase):
         for task in tasks:
             module = task["action"]["__ansible_module_original__"]
 
-            if module not in self.module_aliases:
-                loaded_module = load_plugin(module)
-                target = loaded_module.resolved_fqcn
-                self.module_aliases[module] = target
+            module_alias = self.module_aliases.get(module)
+            if module_alias is None:
+                target = ModuleIndex().resolve(module)
 
+                # The aliases are shared by all threads, every entry is written once
+                # with its final value.
                 if target is None:
                     self.module_aliases[module] = module
                     continue
 
-                if target not in self.module_aliases:
-                    self.module_aliases[target] = target
+                self.module_aliases[module] = target
+                self.module_aliases.setdefault(target, target)
+                module_alias = target
 
-            if module != self.module_aliases[module]:
-                module_alias = self.module_aliases[module]
+            if module != module_alias:
                 if module_alias.startswith("ansible.builtin"):
                     legacy_module = module_alias.replace(
                         "ansible.builtin.",
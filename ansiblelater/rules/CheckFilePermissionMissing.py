@@ -30,6 +30,7 @@ class CheckFilePermissionMissing(RuleBase):
         "to avoid unexpected file permissions"
     )
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     _modules = {
         "archive",
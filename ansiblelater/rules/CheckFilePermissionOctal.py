@@ -26,6 +26,7 @@ class CheckFilePermissionOctal(RuleBase):
     description = "Numeric file permissions without a leading zero can behave unexpectedly"
     helptext = '`mode: {mode}` should be strings with a leading zero `mode: "0{mode}"`'
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
@@ -8,22 +8,20 @@ class CheckFilterSeparation(RuleBase):
     description = "Jinja2 filters should be separated with spaces"
     helptext = "no suitable numbers of spaces (required: 1)"
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars"]
+    line_patterns = [RuleBase.LinePattern("{{(.*?)}}", literal="{{")]
 
     def check(self, candidate, settings):
-        yamllines, errors = self.get_normalized_yaml(candidate, settings)
+        line_matches, errors = self.get_line_matches(candidate, settings)
 
         matches = []
-        braces = re.compile("{{(.*?)}}")
         filters = re.compile(r"(?<=\|)((\s{2,})*\S+)|(\S+(\s{2,})*)(?=\|)")
 
         if not errors:
-            for i, line in yamllines:
-                match = braces.findall(line)
-                if match:
-                    for item in match:
-                        # replace potential regex in filters
-                        item = re.sub(r"\(.+\)", "(dummy)", item)
-                        matches.append((i, item))
+            for i, match in line_matches[0]:
+                for item in match:
+                    # replace potential regex in filters
+                    item = re.sub(r"\(.+\)", "(dummy)", item)
+                    matches.append((i, item))
 
             for i, item in matches:
                 if filters.findall(item):
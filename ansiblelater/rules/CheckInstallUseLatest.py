@@ -6,6 +6,7 @@ class CheckInstallUseLatest(RuleBase):
     description = "Package installs should use present, not latest"
     helptext = "package installs should use `state=present` with or without a version"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
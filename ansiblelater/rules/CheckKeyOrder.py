@@ -24,6 +24,7 @@ class CheckKeyOrder(RuleBase):
     description = "Check for recommended key order"
     helptext = "{type} key order can be improved to `{sorted_keys}`"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         errors = []
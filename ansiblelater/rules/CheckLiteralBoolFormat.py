@@ -8,16 +8,18 @@ class CheckLiteralBoolFormat(RuleBase):
     description = "Literal bools should be consistent"
     helptext = "literal bools should be written as `{bools}`"
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars"]
+    line_patterns = [
+        RuleBase.LinePattern(
+            re.compile(r"(?:[=!]=|:)\s*(true|false|yes|no|on|off)\s*$", re.IGNORECASE)
+        )
+    ]
 
     def check(self, candidate, settings):
-        yamllines, errors = self.get_normalized_yaml(candidate, settings)
-
-        litera_bools = re.compile(r"(?:[=!]=|:)\s*(true|false|yes|no|on|off)\s*$", re.IGNORECASE)
+        line_matches, errors = self.get_line_matches(candidate, settings)
         allowed = settings["ansible"]["literal-bools"]
 
         if not errors:
-            for i, line in yamllines:
-                matches = litera_bools.findall(line)
+            for i, matches in line_matches[0]:
                 if any(m not in allowed for m in matches):
                     errors.append(self.Error(i, self.helptext.format(bools=", ".join(allowed))))
 
@@ -8,13 +8,13 @@ class CheckLocalAction(RuleBase):
     description = "Don't use local_action"
     helptext = "`delegate_to: localhost` should be used instead of `local_action`"
     types = ["playbook", "task", "handler"]
+    line_patterns = [RuleBase.LinePattern("local_action", literal="local_action")]
 
     def check(self, candidate, settings):
-        yamllines, errors = self.get_normalized_yaml(candidate, settings)
+        line_matches, errors = self.get_line_matches(candidate, settings)
 
         if not errors:
-            for i, line in yamllines:
-                if "local_action" in line:
-                    errors.append(self.Error(i, self.helptext))
+            for i, _ in line_matches[0]:
+                errors.append(self.Error(i, self.helptext))
 
         return self.Result(candidate.path, errors)
@@ -8,6 +8,7 @@ class CheckNameFormat(RuleBase):
     description = "Name of tasks and handlers must be formatted"
     helptext = "name `{name}` should start with uppercase"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
@@ -6,6 +6,7 @@ class CheckNamedTask(RuleBase):
     description = "Tasks and handlers must be named"
     helptext = "module `{module}` used without or empty `name` attribute"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
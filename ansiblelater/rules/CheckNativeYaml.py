@@ -6,19 +6,15 @@ class CheckNativeYaml(RuleBase):
     description = "Use YAML format for tasks and handlers rather than key=value"
     helptext = "task arguments appear to be in key value rather than YAML format"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
-        tasks, errors = self.get_action_tasks(candidate, settings)
+        normal_forms, errors = self.get_normalized_tasks(candidate, settings, full=True)
         exclude_modules = settings["ansible"]["native-yaml"]["exclude"]
 
         if not errors:
-            for task in tasks:
-                normal_form, error = self.get_normalized_task(task, candidate, settings)
-
-                if error:
-                    errors.extend(error)
-                    break
-
+            for normal_form in normal_forms:
+                task = normal_form["__raw_task__"]
                 module = normal_form["action"]["__ansible_module__"]
                 arguments = [
                     bytes(x, "utf-8").decode("utf8", "ignore")
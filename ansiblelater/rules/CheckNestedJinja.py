@@ -19,8 +19,6 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
-import re
-
 from ansiblelater.rule import RuleBase
 
 
@@ -32,23 +30,16 @@ class CheckNestedJinja(RuleBase):
         "like `{{ list_one + {{ list_two | max }} }}`"
     )
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars"]
+    line_patterns = [
+        RuleBase.LinePattern(r"{{(?:[^{}]*)?[^'\"]{{", literal="{{", skip_unsafe=True)
+    ]
 
     def check(self, candidate, settings):
-        yamllines, errors = self.get_normalized_yaml(candidate, settings)
-        pattern = re.compile(r"{{(?:[^{}]*)?[^'\"]{{")
-        matches = []
+        line_matches, errors = self.get_line_matches(candidate, settings)
 
         if not errors:
-            for i, line in yamllines:
-                if "!unsafe" in line:
-                    continue
-
-                match = pattern.findall(line)
-                if match:
-                    for item in match:
-                        matches.append((i, item))
-
-            for i, _ in matches:
-                errors.append(self.Error(i, self.helptext))
+            for i, match in line_matches[0]:
+                for _ in match:
+                    errors.append(self.Error(i, self.helptext))
 
         return self.Result(candidate.path, errors)
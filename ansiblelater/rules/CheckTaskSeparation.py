@@ -9,6 +9,7 @@ class CheckTaskSeparation(RuleBase):
     description = "Single tasks should be separated by empty line"
     helptext = "missing task separation (required: 1 empty line)"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         options = defaultdict(dict)
@@ -8,6 +8,7 @@ class CheckUniqueNamedTask(RuleBase):
     description = "Tasks and handlers must be uniquely named within a single file"
     helptext = "name `{name}` appears multiple times"
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
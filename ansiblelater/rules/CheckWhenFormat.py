@@ -9,6 +9,7 @@ class CheckWhenFormat(RuleBase):
     )
 
     types = ["playbook", "task", "handler"]
+    needs_ansible = True
 
     def check(self, candidate, settings):
         tasks, errors = self.get_normalized_tasks(candidate, settings)
@@ -7,7 +7,6 @@ class CheckYamlColons(RuleBase):
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars", "meta"]
 
     def check(self, candidate, settings):
-        options = f"rules: {{colons: {settings['yamllint']['colons']}}}"
-        errors = self.run_yamllint(candidate, options)
+        errors = self.get_yamllint_errors(candidate, settings, "colons")
 
         return self.Result(candidate.path, errors)
@@ -7,7 +7,6 @@ class CheckYamlDocumentEnd(RuleBase):
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars", "meta"]
 
     def check(self, candidate, settings):
-        options = f"rules: {{document-end: {settings['yamllint']['document-end']}}}"
-        errors = self.run_yamllint(candidate, options)
+        errors = self.get_yamllint_errors(candidate, settings, "document-end")
 
         return self.Result(candidate.path, errors)
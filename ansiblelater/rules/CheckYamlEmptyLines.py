@@ -7,7 +7,6 @@ class CheckYamlEmptyLines(RuleBase):
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars", "meta"]
 
     def check(self, candidate, settings):
-        options = f"rules: {{empty-lines: {settings['yamllint']['empty-lines']}}}"
-        errors = self.run_yamllint(candidate, options)
+        errors = self.get_yamllint_errors(candidate, settings, "empty-lines")
 
         return self.Result(candidate.path, errors)
@@ -7,7 +7,6 @@ class CheckYamlHyphens(RuleBase):
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars", "meta"]
 
     def check(self, candidate, settings):
-        options = f"rules: {{hyphens: {settings['yamllint']['hyphens']}}}"
-        errors = self.run_yamllint(candidate, options)
+        errors = self.get_yamllint_errors(candidate, settings, "hyphens")
 
         return self.Result(candidate.path, errors)
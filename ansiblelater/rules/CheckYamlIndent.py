@@ -7,7 +7,6 @@ class CheckYamlIndent(RuleBase):
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars", "meta"]
 
     def check(self, candidate, settings):
-        options = f"rules: {{document-start: {settings['yamllint']['document-start']}}}"
-        errors = self.run_yamllint(candidate, options)
+        errors = self.get_yamllint_errors(candidate, settings, "document-start")
 
         return self.Result(candidate.path, errors)
@@ -7,7 +7,6 @@ class CheckYamlOctalValues(RuleBase):
     types = ["playbook", "task", "handler", "rolevars", "hostvars", "groupvars", "meta"]
 
     def check(self, candidate, settings):
-        options = f"rules: {{octal-values: {settings['yamllint']['octal-values']}}}"
-        errors = self.run_yamllint(candidate, options)
+        errors = self.get_yamllint_errors(candidate, settings, "octal-values")
 
         return self.Result(candidate.path, errors)
@@ -2,18 +2,17 @@
 
 import importlib.resources
 import os
+import subprocess
 
-import anyconfig
-import jsonschema.exceptions
-import pathspec
 from appdirs import AppDirs
-from jsonschema._utils import format_as_index
 
-from ansiblelater import utils
+from ansiblelater import LOG, utils
 
 config_dir = AppDirs("ansible-later").user_config_dir
 default_config_file = os.path.join(config_dir, "config.yml")
 
+DISCOVERY_MODES = ["walk", "git"]
+
 
 class Settings:
     """
@@ -36,8 +35,10 @@ class Settings:
         self.config_file = config_file
         self.schema = None
         self.args_files = False
+        self.filespec = None
         self.args = self._set_args(args)
         self.config = self._get_config()
+        self.changes = self._get_changes()
         self._update_filelist()
 
     def _set_args(self, args):
@@ -72,6 +73,8 @@ class Settings:
 
     def _get_config(self):
         defaults = self._get_defaults()
+        import anyconfig
+
         source_files = []
         source_files.append(self.config_file)
         source_files.append(os.path.join(os.getcwd(), ".later"))
@@ -128,11 +131,25 @@ class Settings:
                 ],
                 "ignore_dotfiles": True,
                 "exclude_files": [],
+                "discovery": "walk",
             },
             "logging": {
                 "level": "WARNING",
                 "json": False,
             },
+            "cache": {
+                "enabled": False,
+                "dir": ".later_cache",
+            },
+            "diff": {
+                "ref": "",
+                "file": "",
+            },
+            "executor": {
+                "backend": "auto",
+                "jobs": 0,
+                "order": "path",
+            },
             "ansible": {
                 "custom_modules": [],
                 "double-braces": {
@@ -187,11 +204,17 @@ class Settings:
             },
         }
 
+        import anyconfig
+
         self.schema = anyconfig.gen_schema(defaults)
 
         return defaults
 
     def _validate(self, config):
+        import anyconfig
+        import jsonschema.exceptions
+        from jsonschema._utils import format_as_index
+
         try:
             anyconfig.validate(config, self.schema, ac_schema_safe=False)
             return True
@@ -208,6 +231,25 @@ class Settings:
                 f"Failed validating '{validator}' at {path}: {msg}"
             )
 
+    def _get_changes(self):
+        from ansiblelater.utils.diff import ChangedLines, DiffError
+
+        ref = self.config["diff"]["ref"]
+        diff_file = self.config["diff"]["file"]
+
+        if ref and diff_file:
+            utils.sysexit_with_message("Diff ref and diff file can not be used together")
+
+        try:
+            if ref:
+                return ChangedLines.from_ref(ref)
+            if diff_file:
+                return ChangedLines.from_file(diff_file)
+        except DiffError as e:
+            utils.sysexit_with_message(str(e))
+
+        return None
+
     def _update_filelist(self):
         includes = self.config["rules"]["files"]
         excludes = self.config["rules"]["exclude_files"]
@@ -219,16 +261,144 @@ class Settings:
         if self.args_files:
             del excludes[:]
 
-        filelist = []
-        for root, _dirs, files in os.walk("."):
-            for filename in files:
-                filelist.append(os.path.relpath(os.path.normpath(os.path.join(root, filename))))
+            # Explicitly passed files are used as they are, there is nothing to discover.
+            if all(os.path.isfile(f) and not utils.has_glob(f) for f in includes):
+                files = [os.path.relpath(os.path.normpath(f)) for f in includes]
+                if self.changes is not None:
+                    files = [f for f in files if f in self.changes]
+                self.config["rules"]["files"] = list(dict.fromkeys(files))
+                return
+
+        import pathspec
 
         valid = []
         includespec = pathspec.PathSpec.from_lines("gitwildmatch", includes)
         excludespec = pathspec.PathSpec.from_lines("gitwildmatch", excludes)
+        discovery = self.config["rules"]["discovery"]
+        if discovery not in DISCOVERY_MODES:
+            utils.sysexit_with_message(
+                f"Invalid discovery mode '{discovery}', "
+                f"expected one of: {', '.join(DISCOVERY_MODES)}"
+            )
+
+        filelist = None
+        if self.changes is not None:
+            # Only files touched by the diff are reviewed, no need to discover others.
+            filelist = [f for f in self.changes.files if os.path.isfile(f)]
+        elif discovery == "git":
+            filelist = self._git_files()
+
+        # Negated patterns may re-include files below an excluded directory.
+        prune = all(pattern.include is not False for pattern in excludespec.patterns)
+        if self.changes is None:
+            self.filespec = (includespec, excludespec, prune)
+
+        if filelist is None:
+            filelist = self._walk("", excludespec if prune else None)
+
         for item in filelist:
             if includespec.match_file(item) and not excludespec.match_file(item):
                 valid.append(item)
 
         self.config["rules"]["files"] = valid
+
+    def discover(self, directories, skip=()):
+        """
+        Return the files to review in the given directories.
+
+        Only the given directories are scanned, subdirectories in `skip` are not
+        entered. Explicitly passed files and files of a diff are never discovered again.
+
+        :param directories: Directories relative to the working directory.
+        :param skip: Subdirectories that are not entered.
+        :returns: list of relative file paths
+
+        """
+        if self.filespec is None:
+            return []
+
+        includespec, excludespec, prune = self.filespec
+        filelist = None
+        if self.config["rules"]["discovery"] == "git":
+            filelist = self._git_files()
+
+        if filelist is None:
+            skip = frozenset(os.path.normpath(d) for d in skip)
+            filelist = [
+                item
+                for directory in directories
+                for item in self._walk(
+                    "" if directory == "." else directory,
+                    excludespec if prune else None,
+                    skip,
+                )
+            ]
+
+        return [
+            item
+            for item in filelist
+            if includespec.match_file(item) and not excludespec.match_file(item)
+        ]
+
+    @staticmethod
+    def _git_files():
+        """
+        Return tracked and untracked files that are not ignored by git.
+
+        :returns: list of relative file paths or None if the working directory is not
+            part of a git repository
+
+        """
+        try:
+            output = subprocess.run(  # noqa: S603
+                ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],  # noqa: S607
+                capture_output=True,
+                check=True,
+            ).stdout
+        except (OSError, subprocess.CalledProcessError) as e:
+            LOG.warning(f"Git file discovery failed, falling back to directory walk: {e}")
+            return None
+
+        files = []
+        for item in output.decode("utf-8", "surrogateescape").split("\0"):
+            # Skip deleted files and submodules listed by the index.
+            if item and os.path.isfile(item):
+                files.append(os.path.normpath(item))
+
+        return list(dict.fromkeys(files))
+
+    def _walk(self, directory, excludespec=None, skip=frozenset()):
+        """
+        Yield all files below the given directory in `os.walk` order.
+
+        Directories matched by the exclude spec are not entered at all.
+
+        :param directory: Directory relative to the working directory, "" for itself.
+        :param excludespec: An optional `pathspec.PathSpec` of excluded directories.
+        :param skip: Set of directories that are not entered.
+        :returns: generator of relative file paths
+
+        """
+        subdirs = []
+        try:
+            with os.scandir(directory or ".") as entries:
+                for entry in entries:
+                    path = os.path.join(directory, entry.name)
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if not is_dir:
+                        yield path
+                    elif (
+                        not entry.is_symlink()
+                        and path not in skip
+                        and not (excludespec and excludespec.match_file(path + "/"))
+                    ):
+                        subdirs.append(path)
+        except OSError:
+            return
+
+        for subdir in subdirs:
+            yield from self._walk(subdir, excludespec, skip)
@@ -0,0 +1,233 @@
+"""
+Measure the startup cost of ansible-later.
+
+Every measurement runs in a fresh interpreter, so module caches of earlier runs do
+not hide import costs. Results are written as JSON and can be compared with the
+results of another commit:
+
+    python -m ansiblelater.test.benchmark.startup -o before.json
+    git checkout feature
+    python -m ansiblelater.test.benchmark.startup -o after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import ansiblelater
+
+TASK_FILE = """---
+- name: Print a message
+  ansible.builtin.debug:
+    msg: Hello
+"""
+
+RULES_CODE = """
+import os, time
+from ansiblelater import rule
+start = time.perf_counter()
+rule.SingleRules([os.path.join(os.path.dirname(rule.__file__), "rules")])
+print(time.perf_counter() - start)
+"""
+
+
+def _env():
+    env = dict(os.environ, PY_COLORS="0")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(ansiblelater.__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    return env
+
+
+def _summary(samples):
+    return {"min": min(samples), "median": statistics.median(samples)}
+
+
+def cold_start(argv, cwd, repeat):
+    """Return the wall clock time of complete CLI runs, failed runs raise an error."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-m", "ansiblelater", *argv],
+            cwd=cwd,
+            env=_env(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        samples.append(time.perf_counter() - start)
+
+    return _summary(samples)
+
+
+def parse_importtime(output, module):
+    """
+    Return the cumulative import time of a module from `-X importtime` output.
+
+    :param output: The stderr of an interpreter started with `-X importtime`.
+    :param module: Name of the module.
+    :returns: seconds or None if the module was not imported
+
+    """
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1e6
+
+    return None
+
+
+def import_time(module, repeat):
+    """Return the cumulative time to import a module into a fresh interpreter."""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(  # noqa: S603
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            env=_env(),
+            capture_output=True,
+            text=True,
+            check=False,
+        ).stderr
+        seconds = parse_importtime(output, module)
+        if seconds is not None:
+            samples.append(seconds)
+
+    return _summary(samples) if samples else None
+
+
+def rule_loading(repeat):
+    """Return the time to load the built-in rules into a fresh interpreter."""
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", RULES_CODE],
+            env=_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(float(output))
+
+    return _summary(samples)
+
+
+def modules():
+    """Return the names of all modules of the package except the tests."""
+    names = ["ansiblelater"]
+    for info in pkgutil.walk_packages(ansiblelater.__path__, "ansiblelater."):
+        if info.name.startswith("ansiblelater.test") or info.name.endswith("__main__"):
+            continue
+        names.append(info.name)
+
+    return sorted(names)
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            cwd=os.path.dirname(ansiblelater.__file__),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(repeat):
+    """
+    Run all measurements.
+
+    :param repeat: Number of samples per measurement.
+    :returns: dict of results
+
+    """
+    with tempfile.TemporaryDirectory() as empty, tempfile.TemporaryDirectory() as single:
+        os.makedirs(os.path.join(single, "tasks"))
+        with open(os.path.join(single, "tasks", "main.yml"), "w", encoding="utf-8") as f:
+            f.write(TASK_FILE)
+
+        cli = {
+            "version": cold_start(["--version"], empty, repeat),
+            "single_file": cold_start([os.path.join("tasks", "main.yml")], single, repeat),
+            "empty_tree": cold_start([], empty, repeat),
+        }
+
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "repeat": repeat,
+        "cli": cli,
+        "imports": {module: import_time(module, repeat) for module in modules()},
+        "rules": rule_loading(repeat),
+    }
+
+
+def _flatten(results):
+    flat = {f"cli.{name}": value for name, value in results["cli"].items()}
+    flat.update({f"import.{name}": value for name, value in results["imports"].items()})
+    flat["rules"] = results["rules"]
+    return {name: value["min"] for name, value in flat.items() if value}
+
+
+def compare(old, new):
+    """
+    Return a report of the differences between two results.
+
+    :param old: Results of the baseline.
+    :param new: Results to compare with the baseline.
+    :returns: str
+
+    """
+    old = _flatten(old)
+    new = _flatten(new)
+    width = max(len(name) for name in new)
+
+    lines = []
+    for name, seconds in new.items():
+        if name in old:
+            change = (seconds - old[name]) / old[name] * 100 if old[name] else 0.0
+            before = f"{old[name] * 1000:9.1f}ms"
+            lines.append(f"{name:<{width}} {before} {seconds * 1000:9.1f}ms {change:+7.1f}%")
+        else:
+            lines.append(f"{name:<{width}} {'-':>11} {seconds * 1000:9.1f}ms")
+
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the startup cost of ansible-later")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="samples per measurement")
+    parser.add_argument("--compare", metavar="FILE", help="compare with earlier results")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    output = json.dumps(results, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            sys.stdout.write(compare(json.load(f), results) + "\n")
+    elif not args.output:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Test startup benchmark."""
+
+import subprocess
+
+import pytest
+
+from ansiblelater.test.benchmark import startup
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   ansiblelater.exceptions
+import time:      2500 |      42000 | ansiblelater.rule
+"""
+
+
+def test_parse_importtime():
+    assert startup.parse_importtime(IMPORTTIME, "ansiblelater.rule") == 0.042
+    assert startup.parse_importtime(IMPORTTIME, "ansiblelater.exceptions") == 0.00012
+    assert startup.parse_importtime(IMPORTTIME, "ansible") is None
+
+
+def test_cold_start_failure(tmp_path):
+    with pytest.raises(subprocess.CalledProcessError):
+        startup.cold_start(["--no-such-option"], str(tmp_path), 1)
+
+
+def test_modules():
+    modules = startup.modules()
+
+    assert "ansiblelater.rule" in modules
+    assert not [m for m in modules if m.startswith("ansiblelater.test")]
+
+
+def test_compare():
+    old = {"cli": {"version": {"min": 0.2}}, "imports": {}, "rules": {"min": 0.05}}
+    new = {"cli": {"version": {"min": 0.1}}, "imports": {}, "rules": {"min": 0.05}}
+
+    report = startup.compare(old, new).splitlines()
+
+    assert report[0].split()[-1] == "-50.0%"
+    assert report[1].split()[-1] == "+0.0%"
@@ -0,0 +1,100 @@
+"""Test cache module."""
+
+import os
+
+import pytest
+
+from ansiblelater.cache import ResultCache
+from ansiblelater.rule import RuleBase
+
+
+@pytest.fixture
+def config(tmp_path):
+    return {
+        "cache": {"enabled": True, "dir": str(tmp_path / ".later_cache")},
+        "rules": {"include_filter": [], "exclude_filter": []},
+        "ansible": {"custom_modules": []},
+        "yamllint": {},
+    }
+
+
+@pytest.fixture
+def reviewed_file(tmp_path):
+    path = tmp_path / "main.yml"
+    path.write_text("---\nfoo: bar\n")
+    os.utime(path, ns=(0, 0))
+
+    return str(path)
+
+
+def test_roundtrip(config, reviewed_file):
+    cache = ResultCache(config, "checksum")
+    cache.set(
+        reviewed_file,
+        cache.snapshot(reviewed_file),
+        [["ANS101", "desc", [RuleBase.Error(2, "foo", bar="baz")]]],
+    )
+
+    results = cache.get(reviewed_file)
+
+    assert results[0][:2] == ["ANS101", "desc"]
+    assert results[0][2][0].to_dict() == {"lineno": 2, "message": "foo", "bar": "baz"}
+
+
+def test_invalidation(config, reviewed_file):
+    cache = ResultCache(config, "checksum")
+    cache.set(reviewed_file, cache.snapshot(reviewed_file), [["ANS101", "desc", []]])
+
+    assert ResultCache(config, "other").get(reviewed_file) is None
+
+    os.utime(reviewed_file, ns=(10**9, 10**9))
+    assert cache.get(reviewed_file) is not None
+
+    with open(reviewed_file, "w") as f:
+        f.write("---\nfoo: baz\n")
+    assert cache.get(reviewed_file) is None
+
+
+def test_skip_lossy_results(config, reviewed_file):
+    cache = ResultCache(config, "checksum")
+    cache.set(
+        reviewed_file,
+        cache.snapshot(reviewed_file),
+        [["ANS101", "desc", [RuleBase.Error(1, ("foo",))]]],
+    )
+
+    assert cache.get(reviewed_file) is None
+
+
+def test_modified_during_review(config, reviewed_file):
+    cache = ResultCache(config, "checksum")
+    snapshot = cache.snapshot(reviewed_file)
+
+    # The file changes while it is reviewed, results belong to the old content.
+    with open(reviewed_file, "w") as f:
+        f.write("---\nfoo: baz\n")
+    os.utime(reviewed_file, ns=(10**9, 10**9))
+    cache.set(reviewed_file, snapshot, [["ANS101", "desc", []]])
+
+    assert cache.get(reviewed_file) is None
+
+
+def test_ansible_environment(config, tmp_path, monkeypatch):
+    library = tmp_path / "library"
+    library.mkdir()
+    monkeypatch.setattr("ansiblelater.cache.ansible_version", lambda: "2.14.0")
+    monkeypatch.setattr("ansiblelater.cache.environment", lambda: "collections")
+
+    key = ResultCache(config, "checksum").key
+    ansible_key = ResultCache(config, "checksum", True, [str(library)]).key
+    assert ansible_key != key
+
+    (library / "mymodule.py").write_text("# custom module\n")
+    assert ResultCache(config, "checksum", True, [str(library)]).key != ansible_key
+    assert ResultCache(config, "checksum", False, [str(library)]).key == key
+
+    monkeypatch.setattr("ansiblelater.cache.environment", lambda: "upgraded")
+    assert ResultCache(config, "checksum", True, []).key != ansible_key
+
+    monkeypatch.setattr("ansiblelater.cache.ansible_version", lambda: "2.15.0")
+    assert ResultCache(config, "checksum").key != key
@@ -0,0 +1,118 @@
+"""Test candidate module."""
+
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import ansiblelater
+from ansiblelater import candidate, settings, utils
+from ansiblelater.exceptions import LaterError
+from ansiblelater.utils import yamlhelper
+
+
+@pytest.fixture
+def settings_instance():
+    return settings.Settings(args={"rules": {"files": []}})
+
+
+def test_artifacts_parse_once(tmp_path, mocker, settings_instance):
+    task_file = tmp_path / "tasks" / "main.yml"
+    task_file.parent.mkdir()
+    task_file.write_text("---\n- name: Debug\n  debug:\n    msg: foo\n")
+
+    spy = mocker.spy(yamlhelper, "parse_yaml_linenumbers")
+    c = candidate.Candidate.classify(str(task_file), settings_instance)
+
+    assert c.artifacts.yaml() is c.artifacts.yaml()
+    assert c.artifacts.action_tasks()[0]["name"] == "Debug"
+    assert spy.call_count == 1
+
+
+def test_artifacts_faulty(tmp_path, mocker, settings_instance):
+    task_file = tmp_path / "tasks" / "main.yml"
+    task_file.parent.mkdir()
+    task_file.write_text("---\nfoo: [\n")
+
+    spy = mocker.spy(yamlhelper, "parse_yaml_linenumbers")
+    c = candidate.Candidate.classify(str(task_file), settings_instance)
+
+    for _ in range(2):
+        with pytest.raises(LaterError):
+            c.artifacts.action_tasks()
+
+    assert spy.call_count == 1
+
+
+def test_artifacts_normalized_tasks(tmp_path, settings_instance):
+    task_file = tmp_path / "tasks" / "main.yml"
+    task_file.parent.mkdir()
+    task_file.write_text(
+        "---\n- name: Run\n  command: echo foo\n\n"
+        "- name: Skip\n  command: echo bar\n  tags: [skip_ansible_later]\n"
+    )
+
+    c = candidate.Candidate.classify(str(task_file), settings_instance)
+    full = c.artifacts.normalized_tasks(full=True)
+    filtered = c.artifacts.normalized_tasks()
+
+    assert [t["name"] for t in full] == ["Run", "Skip"]
+    assert [t["name"] for t in filtered] == ["Run"]
+    assert filtered[0] is full[0]
+
+    with pytest.raises(TypeError):
+        full[0]["name"] = "Changed"
+    with pytest.raises(TypeError):
+        full[0]["action"]["__ansible_module__"] = "shell"
+
+
+NORMALIZE_CODE = """
+import sys
+import threading
+from ansiblelater import candidate, settings, utils
+config = settings.Settings(args={"rules": {"files": []}})
+c = candidate.Candidate.classify(sys.argv[1], config)
+print(c.artifacts.normalized_tasks()[0]["action"]["__ansible_module__"])
+"""
+
+
+def test_normalize_role_library_module(tmp_path):
+    role = tmp_path / "roles" / "web"
+    (role / "library").mkdir(parents=True)
+    (role / "library" / "mymodule.py").write_text("# custom module\n")
+    (role / "tasks").mkdir()
+    (role / "tasks" / "main.yml").write_text("---\n- name: Custom\n  mymodule:\n    foo: bar\n")
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(ansiblelater.__file__)))
+
+    # A fresh interpreter, no rule has initialized the plugin loader before.
+    output = subprocess.run(
+        [sys.executable, "-c", NORMALIZE_CODE, "roles/web/tasks/main.yml"],
+        cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=root),
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+
+    assert output.strip() == "mymodule"
+
+
+def test_normalize_holds_plugin_loader_lock():
+    task = {"name": "Run", "command": "ls", "__line__": 2, "__file__": "tasks/main.yml"}
+    yamlhelper.normalize_task(dict(task), "tasks/main.yml")
+    done = threading.Event()
+
+    def _normalize():
+        yamlhelper.normalize_task(dict(task), "tasks/main.yml")
+        done.set()
+
+    with utils.plugin_loader_lock:
+        thread = threading.Thread(target=_normalize)
+        thread.start()
+        assert not done.wait(0.2)
+
+    thread.join()
+    assert done.is_set()
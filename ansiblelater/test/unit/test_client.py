@@ -0,0 +1,64 @@
+"""Test client module."""
+
+import os
+import socket
+
+from ansiblelater import client
+
+
+def test_socket_path(monkeypatch):
+    monkeypatch.setenv("ANSIBLE_LATER_SOCKET", "/tmp/later.sock")
+
+    assert client.socket_path() == "/tmp/later.sock"
+
+
+def test_request_without_daemon(tmp_path):
+    assert client.request(["site.yml"], path=str(tmp_path / "missing.sock")) is None
+
+
+def test_socket_path_default(monkeypatch, tmp_path):
+    monkeypatch.delenv("ANSIBLE_LATER_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(client.tempfile, "gettempdir", lambda: str(tmp_path))
+
+    directory = tmp_path / f"ansible-later-{os.getuid()}"
+    assert client.socket_path() == str(directory / "ansible-later.sock")
+
+
+def test_request_public_socket_dir(monkeypatch, tmp_path):
+    monkeypatch.delenv("ANSIBLE_LATER_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    tmp_path.chmod(0o777)
+
+    # The socket is never connected if others can access the socket directory.
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(client.socket_path())
+    sock.listen()
+    try:
+        assert client.request(["site.yml"]) is None
+    finally:
+        sock.close()
+
+
+def test_is_private_dir(tmp_path):
+    private = tmp_path / "private"
+    private.mkdir(mode=0o700)
+    public = tmp_path / "public"
+    public.mkdir()
+    public.chmod(0o755)
+
+    assert client.is_private_dir(str(private))
+    assert not client.is_private_dir(str(public))
+    assert not client.is_private_dir(str(tmp_path / "missing"))
+
+
+def test_import_env():
+    env = {"ANSIBLE_CONFIG": "ansible.cfg", "ANSIBLE_LATER_SOCKET": "later.sock", "HOME": "/root"}
+
+    assert client.import_env(env) == {"ANSIBLE_CONFIG": "ansible.cfg"}
+
+
+def test_run_env():
+    env = {"ANSIBLE_CONFIG": "ansible.cfg", "PY_COLORS": "0", "TOKEN": "secret"}
+
+    assert client.run_env(env) == {"ANSIBLE_CONFIG": "ansible.cfg", "PY_COLORS": "0"}
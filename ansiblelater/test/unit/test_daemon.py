@@ -0,0 +1,28 @@
+"""Test daemon module."""
+
+import os
+
+from ansible.config.manager import find_ini_config_file
+
+from ansiblelater import __version__, client, daemon
+
+
+def test_compatible_ansible_config(tmp_path, monkeypatch):
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "ansible.cfg").write_text("[defaults]\nlibrary = ./library\n")
+    monkeypatch.chdir(project)
+
+    server = daemon.Server(str(tmp_path / "later.sock"))
+    server.ansible_config = daemon.config_state(find_ini_config_file())
+
+    def _request(cwd):
+        return {"version": __version__, "env": client.run_env(), "cwd": str(cwd)}
+
+    assert server._compatible(_request(project))
+    assert not server._compatible(_request(plain))
+
+    os.utime(project / "ansible.cfg", ns=(0, 0))
+    assert not server._compatible(_request(project))
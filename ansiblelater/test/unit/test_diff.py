@@ -0,0 +1,82 @@
+"""Test diff module."""
+
+import subprocess
+
+import pytest
+
+from ansiblelater.rule import RuleBase
+from ansiblelater.utils.diff import ChangedLines, DiffError
+
+PATCH = """\
+diff --git a/tasks/main.yml b/tasks/main.yml
+--- a/tasks/main.yml
++++ b/tasks/main.yml
+@@ -2,0 +3,2 @@
++- name: foo
++  command: foo
+@@ -10 +11,0 @@
+-- debug:
+diff --git a/meta/main.yml b/meta/main.yml
+--- a/meta/main.yml
++++ b/meta/main.yml
+@@ -3 +2,0 @@
+-foo: bar
+"""
+
+
+def test_changed_lines():
+    changes = ChangedLines(PATCH)
+
+    assert "tasks/main.yml" in changes
+    assert "./meta/main.yml" in changes
+    assert "site.yml" not in changes
+    assert changes.files["tasks/main.yml"] == [range(3, 5)]
+    assert changes.files["meta/main.yml"] == []
+
+
+def test_filter():
+    changes = ChangedLines(PATCH)
+    errors = [RuleBase.Error(3, "in"), RuleBase.Error(7, "out"), RuleBase.Error(None, "file")]
+
+    tasks = changes.filter("tasks/main.yml", [["ANS101", "desc", errors]])
+    meta = changes.filter("meta/main.yml", [["ANS101", "desc", errors]])
+
+    assert [err.message for err in tasks[0][2]] == ["in", "file"]
+    assert [err.message for err in meta[0][2]] == ["file"]
+    assert changes.filter("site.yml", [["ANS101", "desc", errors]]) == []
+
+
+def test_filter_syntax_error():
+    changes = ChangedLines(PATCH)
+    syntax = [RuleBase.Error(9, "syntax error: expected ',' or ']'")]
+    other = [RuleBase.Error(7, "out")]
+
+    tasks = changes.filter(
+        "tasks/main.yml", [["ANS101", "desc", other], ["YML101", "desc", syntax]]
+    )
+
+    assert [err.message for err in tasks[0][2]] == ["out"]
+    assert tasks[1][2] == syntax
+    assert changes.filter("site.yml", [["YML101", "desc", syntax]]) == []
+
+
+def test_invalid_diff(tmp_path):
+    with pytest.raises(DiffError):
+        ChangedLines.from_file(str(tmp_path / "missing.diff"))
+
+
+def test_from_ref_prefix_config(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "main.yml").write_text("---\n- name: One\n")
+    git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    for cmd in (["init", "-q"], ["add", "b"], ["commit", "-qm", "init"]):
+        subprocess.run([*git, *cmd], check=True)  # noqa: S603
+    (tmp_path / "b" / "main.yml").write_text("---\n- name: One\n- name: Two\n")
+
+    for option in ("diff.noprefix", "diff.mnemonicPrefix"):
+        subprocess.run(["git", "config", option, "true"], check=True)  # noqa: S603,S607
+        changes = ChangedLines.from_ref("HEAD")
+        subprocess.run(["git", "config", "--unset", option], check=True)  # noqa: S603,S607
+
+        assert changes.files == {"b/main.yml": [range(3, 4)]}
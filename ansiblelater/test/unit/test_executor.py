@@ -0,0 +1,187 @@
+"""Test executor module."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ansiblelater import executor, settings
+from ansiblelater.rule import SingleRules
+
+
+class FakeCandidate:
+    def __init__(self, path, delay):
+        self.path = path
+        self.delay = delay
+
+    def collect(self):
+        time.sleep(self.delay)
+        return [self.path]
+
+
+@pytest.fixture
+def candidates():
+    return [FakeCandidate(f"file{i:02}.yml", 0.001 * ((i * 7) % 5)) for i in reversed(range(20))]
+
+
+def test_path_order(candidates):
+    with ThreadPoolExecutor(4) as pool:
+        reviewed = list(executor.review(pool, candidates, 3))
+
+    assert [c.path for c, _ in reviewed] == sorted(c.path for c in candidates)
+    assert all(results == [c.path] for c, results in reviewed)
+
+
+def test_completion_order(candidates):
+    with ThreadPoolExecutor(4) as pool:
+        reviewed = list(executor.review(pool, candidates, 3, order="completion"))
+
+    assert sorted(c.path for c, _ in reviewed) == sorted(c.path for c in candidates)
+
+
+def test_early_stop(candidates):
+    with ThreadPoolExecutor(2) as pool:
+        for _ in executor.review(pool, candidates, 2):
+            break
+
+
+def test_serial(candidates):
+    reviewed = list(executor.review(None, candidates, 1))
+
+    assert [c.path for c, _ in reviewed] == sorted(c.path for c in candidates)
+
+
+def test_select_backend():
+    assert executor.select_backend("auto", 8, 2) == "serial"
+    assert executor.select_backend("auto", 1, 100) == "serial"
+    assert executor.select_backend("thread", 8, 2) == "thread"
+
+
+def test_schedule():
+    units = executor.schedule([0.01, 4.0, 0.02, 0.01, 2.0, 0.03], 1)
+
+    assert units[:2] == [[1], [4]]
+    assert sorted(i for unit in units[2:] for i in unit) == [0, 2, 3, 5]
+    assert len(units) < 6
+
+
+def test_schedule_ordered():
+    costs = [0.01, 4.0, 0.02, 0.01, 2.0, 0.03]
+
+    units = executor.schedule(costs, 1, ordered=True)
+    assert units[0] == [1]
+    assert [i for unit in units[1:] for i in unit] == [0, 2, 3, 4, 5]
+
+    units = executor.schedule(costs, 2, ordered=True)
+    assert units[:2] == [[1], [4]]
+    assert [i for unit in units[2:] for i in unit] == [0, 2, 3, 5]
+
+
+class RecordingPool(ThreadPoolExecutor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted = []
+
+    def submit(self, fn, unit):
+        self.submitted.append([candidate.path for _, candidate in unit])
+        return super().submit(fn, unit)
+
+
+def test_path_order_expensive_first():
+    slow = [FakeCandidate("a.yml", 0), *[FakeCandidate(f"b{i:02}.yml", 0) for i in range(8)]]
+    slow.append(FakeCandidate("z.yml", 0))
+    timings = executor.Timings()
+    timings.durations = {"z.yml": 10.0}
+
+    with RecordingPool(1) as pool:
+        reviewed = list(executor.review(pool, slow, 1, timings=timings))
+
+    assert pool.submitted[0] == ["z.yml"]
+    assert [c.path for c, _ in reviewed] == sorted(c.path for c in slow)
+
+
+def test_path_order_expensive_units(candidates):
+    # Half of the files are expensive, only one unit per job starts out of order.
+    timings = executor.Timings()
+    timings.durations = {f"file{i:02}.yml": 10.0 + i for i in range(20)}
+
+    with RecordingPool(2) as pool:
+        reviewed = list(executor.review(pool, candidates, 5, timings=timings))
+
+    assert [c.path for c, _ in reviewed] == sorted(c.path for c in candidates)
+    assert pool.submitted[:5] == [[f"file{i:02}.yml"] for i in range(19, 14, -1)]
+    assert [path for unit in pool.submitted[5:] for path in unit] == [
+        f"file{i:02}.yml" for i in range(15)
+    ]
+
+
+def test_timings(tmp_path):
+    reviewed = tmp_path / "main.yml"
+    reviewed.write_text("---\nfoo: bar\n")
+    candidates = [FakeCandidate(str(reviewed), 0), FakeCandidate(str(tmp_path / "new.yml"), 0)]
+
+    timings = executor.Timings(str(tmp_path / ".later_cache"))
+    timings.update(str(reviewed), 0.5)
+    timings.save()
+
+    assert executor.Timings(str(tmp_path / ".later_cache")).estimate(candidates) == [0.5, 0.0]
+
+
+def test_run_skips_files_without_rules(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "tasks").mkdir()
+    (tmp_path / "tasks" / "main.yml").write_text("---\n- name: Debug\n  debug:\n    msg: foo\n")
+
+    config = settings.Settings(args={"rules": {"files": []}, "executor": {"backend": "serial"}})
+    executor.prepare(config.config)
+
+    # Files of kinds without rules are not opened, missing files do not fail the run.
+    files = [
+        "tasks/main.yml",
+        "roles/foo/files/missing.bin",
+        "roles/foo/library/missing.py",
+        "README.md",
+    ]
+
+    assert executor.run(config, files) == 0
+
+
+def test_timings_skip_cached_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "tasks").mkdir()
+    (tmp_path / "tasks" / "main.yml").write_text("---\n- name: Debug\n  debug:\n    msg: foo\n")
+
+    config = settings.Settings(
+        args={
+            "rules": {"files": []},
+            "cache": {"enabled": True, "dir": str(tmp_path / ".later_cache")},
+            "executor": {"backend": "serial"},
+        }
+    )
+    executor.prepare(config.config)
+
+    executor.run(config, ["tasks/main.yml"])
+    reviewed = executor.Timings(str(tmp_path / ".later_cache")).durations
+    assert list(reviewed) == ["tasks/main.yml"]
+
+    # The second run replays cached results and keeps the measured review duration.
+    executor.run(config, ["tasks/main.yml"])
+
+    assert executor.Timings(str(tmp_path / ".later_cache")).durations == reviewed
+
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_prepare_rule_index(tmp_path, monkeypatch, enabled):
+    monkeypatch.chdir(tmp_path)
+    cache_dir = tmp_path / ".later_cache"
+    config = settings.Settings(
+        args={"rules": {"files": []}, "cache": {"enabled": enabled, "dir": str(cache_dir)}}
+    ).config
+
+    SingleRules.reset()
+    try:
+        executor.prepare(config)
+    finally:
+        SingleRules.reset()
+
+    assert bool(list(cache_dir.glob("rules-*.json"))) == enabled
@@ -0,0 +1,178 @@
+"""Test rule module."""
+
+import os
+
+import pytest
+
+from ansiblelater import candidate, settings
+from ansiblelater.rule import LineScanner, RuleBase, RuleDispatch, RulesLoader
+
+RULE = """import os
+
+from ansiblelater.rule import RuleBase
+
+with open(os.path.join(os.path.dirname(__file__), "imported.log"), "a") as f:
+    f.write("{name}\\n")
+
+
+class {name}(RuleBase):
+    rid = "{rid}"
+    types = ["task"]
+
+    def check(self, candidate, settings):
+        return self.Result(candidate.path, [])
+"""
+
+
+@pytest.fixture
+def rules_dir(tmp_path):
+    directory = tmp_path / "rules"
+    directory.mkdir()
+    for name, rid in [("CheckFoo", "FOO101"), ("CheckBar", "BAR101")]:
+        path = directory / f"{name}.py"
+        path.write_text(RULE.format(name=name, rid=rid))
+        # Files modified within the racy window are not indexed.
+        os.utime(path, ns=(0, 0))
+
+    return directory
+
+
+def _imported(rules_dir):
+    log = rules_dir / "imported.log"
+    modules = log.read_text().split() if log.exists() else []
+    log.unlink(missing_ok=True)
+    return sorted(modules)
+
+
+def test_rules_loader_index(tmp_path, rules_dir):
+    rules = RulesLoader([str(rules_dir)], index_dir=str(tmp_path / "index"))
+
+    assert sorted(rule.rid for rule in rules.rules) == ["BAR101", "FOO101"]
+    assert _imported(rules_dir) == ["CheckBar", "CheckFoo"]
+
+    filtered = RulesLoader([str(rules_dir)], ["FOO101"], index_dir=str(tmp_path / "index"))
+
+    assert [rule.rid for rule in filtered.rules] == ["FOO101"]
+    assert _imported(rules_dir) == ["CheckFoo"]
+    assert filtered.checksum == rules.checksum
+
+
+def test_rules_loader_index_changed(tmp_path, rules_dir):
+    RulesLoader([str(rules_dir)], index_dir=str(tmp_path / "index"))
+    _imported(rules_dir)
+
+    path = rules_dir / "CheckBar.py"
+    path.write_text(RULE.format(name="CheckBar", rid="FOO101"))
+    os.utime(path, ns=(10**9, 10**9))
+
+    with pytest.raises(SystemExit):
+        RulesLoader([str(rules_dir)], ["FOO101"], index_dir=str(tmp_path / "index"))
+
+
+def test_rules_loader_exclude(tmp_path, rules_dir):
+    RulesLoader([str(rules_dir)], index_dir=str(tmp_path / "index"))
+    _imported(rules_dir)
+
+    rules = RulesLoader([str(rules_dir)], exclude_filter=["FOO101"], index_dir=None)
+
+    assert [rule.rid for rule in rules.rules] == ["BAR101"]
+    assert _imported(rules_dir) == ["CheckBar", "CheckFoo"]
+
+
+class _Rule:
+    def __init__(self, rid, types, tags=(), needs_ansible=False):
+        self.rid = rid
+        self.types = types
+        self.tags = list(tags)
+        self.line_patterns = ()
+        self.needs_ansible = needs_ansible
+
+
+def test_rule_dispatch():
+    rules = [
+        _Rule("ANS101", ["task", "handler"], ["security"]),
+        _Rule("ANS102", ["task"], needs_ansible=True),
+        _Rule("YML101", ["task", "rolevars"], ["formatting"]),
+    ]
+
+    dispatch = RuleDispatch(rules, exclude_filter=["ANS102"], warning_filter=["formatting"])
+
+    assert [rule.rid for rule in dispatch.rules("task")] == ["ANS101", "YML101"]
+    assert [rule.rid for rule in dispatch.rules("handler")] == ["ANS101"]
+    assert dispatch.rules("doc") == ()
+    assert dispatch.is_warning("YML101")
+    assert not dispatch.is_warning("ANS101")
+    assert not dispatch.needs_ansible
+    assert RuleDispatch(rules).needs_ansible
+
+
+def test_rule_dispatch_tags():
+    rules = [_Rule("ANS101", ["task"], ["security"]), _Rule("ANS102", ["task"])]
+
+    assert [rule.rid for rule in RuleDispatch(rules, ["security"]).rules("task")] == ["ANS101"]
+    assert [rule.rid for rule in RuleDispatch(rules, [], ["security"]).rules("task")] == ["ANS102"]
+
+
+@pytest.fixture
+def settings_instance():
+    return settings.Settings(args={"rules": {"files": []}})
+
+
+def _playbook(tmp_path, settings_instance, content):
+    path = tmp_path / "site.yml"
+    path.write_text(content)
+    return candidate.Candidate.classify(str(path), settings_instance)
+
+
+def test_yamllint_errors(tmp_path, mocker, settings_instance):
+    config = settings_instance.config
+    playbook = _playbook(tmp_path, settings_instance, "---\n- hosts:  all\n-  name: foo\n")
+    spy = mocker.spy(candidate.linter, "run")
+
+    colons = RuleBase.get_yamllint_errors(playbook, config, "colons")
+    hyphens = RuleBase.get_yamllint_errors(playbook, config, "hyphens")
+
+    assert spy.call_count == 1
+    assert [err.lineno for err in colons] == [2]
+    assert [err.lineno for err in hyphens] == [3]
+    assert RuleBase.get_yamllint_errors(playbook, config, "document-start") == []
+
+
+def test_yamllint_syntax_error(tmp_path, settings_instance):
+    playbook = _playbook(tmp_path, settings_instance, "---\n- hosts: all\n  tasks: [foo\n")
+
+    for rule in ("colons", "hyphens"):
+        errors = RuleBase.get_yamllint_errors(playbook, settings_instance.config, rule)
+        assert len(errors) == 1
+        assert errors[0].message.startswith("syntax error")
+
+
+class _LineRule:
+    def __init__(self, *line_patterns):
+        self.line_patterns = line_patterns
+
+
+def test_line_scanner():
+    first = _LineRule(
+        RuleBase.LinePattern(r"\d", literal="foo"),
+        RuleBase.LinePattern(r"bar"),
+    )
+    second = _LineRule(RuleBase.LinePattern(r"baz", skip_unsafe=True))
+    scanner = LineScanner([first, second, _LineRule()])
+    lines = [(1, "foo1 bar2"), (2, "bar 3"), (3, "baz: !unsafe '{{ x }}'"), (4, "baz")]
+
+    matches = scanner.scan(lines)
+
+    assert scanner.rules == [first, second]
+    assert matches[first] == [[(1, ["1", "2"])], [(1, ["bar"]), (2, ["bar"])]]
+    assert matches[second] == [[(4, ["baz"])]]
+
+
+def test_line_matches_fallback(tmp_path, settings_instance):
+    playbook = _playbook(tmp_path, settings_instance, "---\n# foo\n- hosts: foo\n\n  bar: baz\n")
+    shared = _LineRule(RuleBase.LinePattern(r"foo", literal="foo"))
+    other = _LineRule(RuleBase.LinePattern(r"ba[rz]"))
+    playbook.artifacts.line_scanner = LineScanner([shared])
+
+    assert playbook.artifacts.line_matches(shared) == [[(3, ["foo"])]]
+    assert playbook.artifacts.line_matches(other) == [[(5, ["bar", "baz"])]]
@@ -1,5 +1,7 @@
 """Test settings module."""
 
+import subprocess
+
 import pytest
 
 from ansiblelater import settings
@@ -25,3 +27,48 @@ def test_args_setter(settings_instance):
     s = settings_instance._set_args(default)
 
     assert x == s
+
+
+@pytest.fixture
+def worktree(tmp_path, monkeypatch):
+    for path in ["site.yml", "roles/r1/tasks/main.yml", ".cache/data.yml", "vendor/r2/main.yml"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("---\n")
+    monkeypatch.chdir(tmp_path)
+
+    return tmp_path
+
+
+def test_filelist_prunes_excluded_dirs(worktree, monkeypatch):
+    walked = []
+    walk = settings.Settings._walk
+
+    def _walk(self, directory, excludespec=None, skip=frozenset()):
+        walked.append(directory)
+        return walk(self, directory, excludespec, skip)
+
+    monkeypatch.setattr(settings.Settings, "_walk", _walk)
+    (worktree / ".later.yml").write_text("rules:\n  exclude_files: [vendor/]\n")
+
+    s = settings.Settings(args={"rules.files": []})
+
+    assert sorted(s.config["rules"]["files"]) == ["roles/r1/tasks/main.yml", "site.yml"]
+    assert ".cache" not in walked
+    assert "vendor" not in walked
+
+
+def test_filelist_explicit_files(worktree, monkeypatch):
+    monkeypatch.setattr(settings.Settings, "_walk", None)
+
+    s = settings.Settings(args={"rules.files": ["./site.yml", "roles/r1/tasks/main.yml"]})
+
+    assert s.config["rules"]["files"] == ["site.yml", "roles/r1/tasks/main.yml"]
+
+
+def test_filelist_git(worktree):
+    subprocess.run(["git", "init", "-q"], check=True)  # noqa: S607
+    (worktree / ".gitignore").write_text("vendor/\n")
+
+    s = settings.Settings(args={"rules.files": [], "rules.discovery": "git"})
+
+    assert s.config["rules"]["files"] == ["roles/r1/tasks/main.yml", "site.yml"]
@@ -0,0 +1,76 @@
+"""Test utils module."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import ansiblelater
+from ansiblelater import utils
+
+
+def test_cgroup_v2_quota(tmp_path):
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+
+    assert utils._cgroup_cpu_quota(str(tmp_path)) == 1.5
+
+
+def test_cgroup_v2_unlimited(tmp_path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+
+    assert utils._cgroup_cpu_quota(str(tmp_path)) is None
+
+
+def test_cgroup_v1_quota(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("200000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+
+    assert utils._cgroup_cpu_quota(str(tmp_path)) == 2
+
+
+def test_cgroup_missing(tmp_path):
+    assert utils._cgroup_cpu_quota(str(tmp_path)) is None
+
+
+def test_cli_does_not_import_ansible():
+    code = "import sys, ansiblelater.__main__; print('ansible' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    ).stdout
+
+    assert output.strip() == "False"
+
+
+TEXT_RULES_CODE = """
+import sys
+from ansiblelater import executor, settings
+config = settings.Settings(
+    args={
+        "rules": {"files": [], "include_filter": sys.argv[2:]},
+        "executor": {"backend": sys.argv[1], "jobs": 2},
+    }
+)
+executor.prepare(config.config)
+executor.run(config)
+print("ansible" in sys.modules)
+"""
+
+
+@pytest.mark.parametrize("backend", ["serial", "process"])
+def test_text_rules_do_not_import_ansible(tmp_path, backend):
+    (tmp_path / "tasks").mkdir()
+    for name in ("main", "a", "b", "c"):
+        (tmp_path / "tasks" / f"{name}.yml").write_text("---\n- name: Run\n  command: {{foo}}\n")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(ansiblelater.__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", TEXT_RULES_CODE, backend, "ANS104", "ANS114", "YML101"],
+        cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=root),
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+
+    assert output.splitlines()[-1] == "False"
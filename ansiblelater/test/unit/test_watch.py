@@ -0,0 +1,77 @@
+"""Test watch module."""
+
+import os
+
+import pytest
+
+from ansiblelater import executor
+from ansiblelater.settings import Settings
+from ansiblelater.watch import Watcher
+
+
+def test_wait_for_changes(tmp_path, monkeypatch):
+    (tmp_path / "site.yml").write_text("---\n")
+    monkeypatch.chdir(tmp_path)
+    reviewed = []
+    monkeypatch.setattr(executor, "run", lambda settings, files: reviewed.append(files) or 0)
+
+    args = {"rules.files": []}
+    watcher = Watcher(args, Settings(args=dict(args)), interval=0.01, debounce=0.01)
+    watcher.review()
+    (tmp_path / "site.yml").write_text("---\nfoo: bar\n")
+    os.utime(tmp_path / "site.yml", ns=(0, 0))
+
+    snapshot = watcher._wait_for_changes()
+
+    assert reviewed == [["site.yml"]]
+    assert snapshot["files"]["site.yml"] != watcher.snapshot["files"]["site.yml"]
+    assert snapshot["directories"] == watcher.snapshot["directories"]
+
+
+def test_update_files(tmp_path, monkeypatch):
+    (tmp_path / "site.yml").write_text("---\n")
+    (tmp_path / "old.yml").write_text("---\n")
+    (tmp_path / "roles" / "a" / "tasks").mkdir(parents=True)
+    (tmp_path / "roles" / "a" / "tasks" / "main.yml").write_text("---\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(executor, "run", lambda settings, files: 0)
+
+    args = {"rules.files": []}
+    watcher = Watcher(args, Settings(args=dict(args)), interval=0.01, debounce=0.01)
+    watcher.review()
+    monkeypatch.setattr(watcher, "_reload", lambda: pytest.fail("settings reloaded"))
+
+    (tmp_path / "old.yml").unlink()
+    (tmp_path / "roles" / "b" / "tasks").mkdir(parents=True)
+    (tmp_path / "roles" / "b" / "tasks" / "main.yml").write_text("---\n")
+    os.utime(tmp_path, ns=(0, 0))
+    os.utime(tmp_path / "roles", ns=(0, 0))
+    watcher._update_files(watcher._take_snapshot())
+
+    assert sorted(watcher.settings.config["rules"]["files"]) == [
+        os.path.join("roles", "a", "tasks", "main.yml"),
+        os.path.join("roles", "b", "tasks", "main.yml"),
+        "site.yml",
+    ]
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        "yamllint:\n  colons: {bogus-option: 1}\n",
+        "cache:\n  enabled: 1\n",
+    ],
+)
+def test_reload_invalid_config(tmp_path, monkeypatch, config):
+    (tmp_path / "site.yml").write_text("---\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(executor, "run", lambda settings, files: 0)
+
+    args = {"rules.files": []}
+    settings = Settings(args=dict(args))
+    executor.prepare(settings.config)
+    watcher = Watcher(args, settings, interval=0.01, debounce=0.01)
+    (tmp_path / ".later.yml").write_text(config)
+
+    assert watcher._reload() is False
+    assert watcher.settings is settings
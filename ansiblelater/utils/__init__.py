@@ -1,13 +1,16 @@
 """Global utils collection."""
 
 import contextlib
+import math
+import os
 import re
 import sys
+import threading
 from contextlib import suppress
 from functools import lru_cache
 
 import yaml
-from ansible.plugins.loader import module_loader
+from yamllint.config import YamlLintConfig
 
 from ansiblelater import logger
 
@@ -18,6 +21,10 @@ except ImportError:
 
 LOG = logger.get_logger(__name__)
 
+plugin_loader_lock = threading.RLock()
+_module_loader = None
+_module_dirs = []
+
 
 def count_spaces(c_string):
     leading_spaces = 0
@@ -109,26 +116,132 @@ class Singleton(type):
     """Meta singleton class."""
 
     _instances = {}
+    _lock = threading.RLock()
 
     def __call__(cls, *args, **kwargs):
         if cls not in cls._instances:
-            cls._instances[cls] = super().__call__(*args, **kwargs)
+            with cls._lock:
+                if cls not in cls._instances:
+                    cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
 
+    def reset(cls):
+        """Drop the instance, the next call creates a new one."""
+        with cls._lock:
+            cls._instances.pop(cls, None)
+
+
+def module_loader():
+    """
+    Return the ansible module loader.
+
+    Ansible is imported and its plugin loader initialized on first use, runs that
+    never resolve modules do not pay for it.
+    """
+    global _module_loader
+
+    if _module_loader is None:
+        with plugin_loader_lock:
+            if _module_loader is None:
+                try:
+                    from ansible.plugins.loader import init_plugin_loader
+                    from ansible.plugins.loader import module_loader as loader
+
+                    init_plugin_loader()
+                except ImportError:
+                    from ansible.plugins.loader import module_loader as loader
+
+                for path in _module_dirs:
+                    loader.add_directory(path)
+                _module_loader = loader
+
+    return _module_loader
+
+
+def add_module_directory(path):
+    """Add a directory of custom modules to the ansible module loader."""
+    with plugin_loader_lock:
+        if path in _module_dirs:
+            return
+
+        _module_dirs.append(path)
+        if _module_loader is not None:
+            _module_loader.add_directory(path)
+
 
 @lru_cache
 def load_plugin(name):
     """Return loaded ansible plugin/module."""
-    loaded_module = module_loader.find_plugin_with_context(
-        name,
-        ignore_deprecated=True,
-        check_aliases=True,
-    )
-    if not loaded_module.resolved and name.startswith("ansible.builtin."):
-        # fallback to core behavior of using legacy
-        loaded_module = module_loader.find_plugin_with_context(
-            name.replace("ansible.builtin.", "ansible.legacy."),
+    loader = module_loader()
+
+    # The ansible plugin loader caches are not safe for concurrent lookups.
+    with plugin_loader_lock:
+        loaded_module = loader.find_plugin_with_context(
+            name,
             ignore_deprecated=True,
             check_aliases=True,
         )
+        if not loaded_module.resolved and name.startswith("ansible.builtin."):
+            # fallback to core behavior of using legacy
+            loaded_module = loader.find_plugin_with_context(
+                name.replace("ansible.builtin.", "ansible.legacy."),
+                ignore_deprecated=True,
+                check_aliases=True,
+            )
     return loaded_module
+
+
+def yamllint_options(config):
+    """Return the yamllint options for all rules of the yamllint settings block."""
+    return yaml.safe_dump({"rules": config["yamllint"]})
+
+
+@lru_cache
+def load_yamllint_config(options):
+    """Return compiled yamllint config for the given options string."""
+    return YamlLintConfig(options)
+
+
+def _cgroup_cpu_quota(root="/sys/fs/cgroup"):
+    """Return the CPU quota of the current cgroup as number of CPUs or None if unlimited."""
+    try:
+        # cgroup v2
+        with open(os.path.join(root, "cpu.max"), encoding="utf-8") as f:
+            quota, period = f.read().split()[:2]
+        if quota == "max":
+            return None
+        return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    try:
+        # cgroup v1
+        with open(os.path.join(root, "cpu", "cpu.cfs_quota_us"), encoding="utf-8") as f:
+            quota = int(f.read())
+        with open(os.path.join(root, "cpu", "cpu.cfs_period_us"), encoding="utf-8") as f:
+            period = int(f.read())
+        if quota <= 0 or period <= 0:
+            return None
+        return quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus():
+    """Return the number of CPUs usable by this process, honoring affinity and cgroup quotas."""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    quota = _cgroup_cpu_quota()
+    if quota:
+        count = min(count, max(math.ceil(quota), 1))
+
+    return count
+
+
+def default_jobs():
+    """Return the default number of review workers."""
+    cpus = available_cpus()
+    return max(cpus - 2, 2) if cpus > 2 else cpus
@@ -0,0 +1,144 @@
+"""Changed lines of a unified diff."""
+
+import os
+import subprocess
+
+from unidiff import PatchSet
+from unidiff.errors import UnidiffParseError
+
+from ansiblelater.utils import is_line_in_ranges, lines_ranges
+
+
+class DiffError(Exception):
+    """Exception raised if a diff can not be created or parsed."""
+
+
+class ChangedLines:
+    """
+    Lines added or modified by a unified diff, grouped by file.
+
+    Files that only lost lines are known as changed but have no line ranges.
+    """
+
+    def __init__(self, patch):
+        """
+        Initialize changed lines from a unified diff.
+
+        :param patch: The unified diff as string.
+        :returns: None
+
+        """
+        try:
+            patchset = PatchSet(patch)
+        except UnidiffParseError as e:
+            raise DiffError(f"Invalid diff: {e}") from e
+
+        self.files = {}
+        for patched_file in patchset:
+            if patched_file.is_removed_file:
+                continue
+
+            added = sorted(
+                line.target_line_no for hunk in patched_file for line in hunk if line.is_added
+            )
+            self.files[os.path.normpath(patched_file.path)] = (
+                lines_ranges(self._format_spec(added)) or []
+            )
+
+    @staticmethod
+    def _format_spec(lines):
+        spec = []
+        for lineno in lines:
+            if spec and spec[-1][1] == lineno - 1:
+                spec[-1][1] = lineno
+            else:
+                spec.append([lineno, lineno])
+
+        return ",".join(f"{start}-{end}" for start, end in spec)
+
+    @classmethod
+    def from_ref(cls, ref):
+        """
+        Return the lines changed in the working tree since the given git ref.
+
+        :param ref: Any git revision, e.g. a branch name or commit.
+        :returns: ChangedLines
+
+        """
+        try:
+            output = subprocess.run(  # noqa: S603
+                [  # noqa: S607
+                    "git",
+                    "diff",
+                    "--no-color",
+                    "--no-ext-diff",
+                    "--relative",
+                    # The parser expects the default prefixes regardless of the git config.
+                    "--src-prefix=a/",
+                    "--dst-prefix=b/",
+                    "-U0",
+                    ref,
+                    "--",
+                ],
+                capture_output=True,
+                check=True,
+            ).stdout
+        except OSError as e:
+            raise DiffError(f"Failed to run git diff: {e}") from e
+        except subprocess.CalledProcessError as e:
+            raise DiffError(f"Failed to run git diff: {e.stderr.decode().strip()}") from e
+
+        return cls(output.decode("utf-8", "surrogateescape"))
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Return the lines changed by a unified diff file.
+
+        :param path: Path of the diff file.
+        :returns: ChangedLines
+
+        """
+        try:
+            with open(path, encoding="utf-8", errors="surrogateescape") as f:
+                return cls(f.read())
+        except OSError as e:
+            raise DiffError(f"Failed to read diff file: {e}") from e
+
+    def __contains__(self, path):
+        return os.path.normpath(path) in self.files
+
+    def filter(self, path, results):
+        """
+        Drop errors outside of the changed lines of a file.
+
+        Errors without a line number are kept as long as the file has changed. YAML
+        parsers often report syntax errors after the broken line, all errors of a file
+        with syntax errors are kept regardless of their line.
+
+        :param path: Path of the reviewed file.
+        :param results: List of `[rid, description, errors]` items.
+        :returns: list of `[rid, description, errors]` items
+
+        """
+        if path not in self:
+            return []
+
+        if any(self._is_syntax_error(err) for _, _, errors in results for err in errors):
+            return results
+
+        ranges = self.files[os.path.normpath(path)]
+        filtered = []
+        for rid, description, errors in results:
+            kept = []
+            for err in errors:
+                lineno = getattr(err, "lineno", None)
+                if not lineno or (ranges and is_line_in_ranges(lineno, ranges)):
+                    kept.append(err)
+            filtered.append([rid, description, kept])
+
+        return filtered
+
+    @staticmethod
+    def _is_syntax_error(err):
+        return str(getattr(err, "message", err)).startswith("syntax error")
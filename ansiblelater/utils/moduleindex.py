@@ -0,0 +1,135 @@
+"""Persistent index of resolved module names."""
+
+import contextlib
+import glob
+import hashlib
+import importlib.metadata
+import json
+import os
+import threading
+from functools import lru_cache
+
+from ansiblelater import logger
+from ansiblelater.utils import Singleton, load_plugin, module_loader
+
+LOG = logger.get_logger(__name__)
+
+
+@lru_cache(maxsize=None)
+def ansible_version():
+    """
+    Return the installed ansible version without importing ansible.
+
+    :returns: str or None if ansible is not installed
+
+    """
+    for dist in ("ansible-core", "ansible-base", "ansible"):
+        with contextlib.suppress(importlib.metadata.PackageNotFoundError):
+            return importlib.metadata.version(dist)
+
+    return None
+
+
+@lru_cache(maxsize=None)
+def environment():
+    """
+    Return a fingerprint of the ansible version, module paths and installed collections.
+
+    The fingerprint is computed once per process and imports ansible.
+
+    :returns: str
+
+    """
+    from ansible import constants
+    from ansible.release import __version__ as ansible_version
+
+    collections = []
+    for path in constants.COLLECTIONS_PATHS or []:
+        pattern = os.path.join(os.path.expanduser(path), "ansible_collections", "*", "*")
+        for collection in sorted(glob.glob(pattern)):
+            manifest = os.path.join(collection, "MANIFEST.json")
+            mtime = os.stat(manifest).st_mtime_ns if os.path.exists(manifest) else None
+            collections.append([collection, mtime])
+
+    data = json.dumps([ansible_version, constants.DEFAULT_MODULE_PATH, collections])
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+class ModuleIndex(metaclass=Singleton):
+    """
+    Map module names to their fully qualified collection name.
+
+    Lookups that are not in the index yet are resolved by the ansible module loader.
+    If a directory is given, resolved names are appended to an index file that is
+    loaded on the next run. The file is keyed on the ansible version, the module
+    search paths and the installed collections, so it is replaced as soon as any of
+    them change. The index file is only opened by the first lookup, so runs that
+    never resolve modules do not import ansible.
+    """
+
+    def __init__(self, directory=None):
+        """
+        Initialize the module index.
+
+        :param directory: Optional directory to persist the index in.
+        :returns: None
+
+        """
+        self.modules = {}
+        self.directory = os.path.abspath(directory) if directory else None
+        self.path = None
+        self._loaded = not directory
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_key():
+        data = json.dumps([environment(), module_loader().print_paths()])
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    name, fqcn = json.loads(line)
+                    self.modules[name] = fqcn
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            LOG.debug(f"Ignoring module index {self.path}: {e}")
+
+    def _append(self, name, fqcn):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Single short appends keep the file consistent across concurrent workers.
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps([name, fqcn]) + "\n")
+        except OSError as e:
+            LOG.debug(f"Failed to update module index {self.path}: {e}")
+
+    def resolve(self, name):
+        """
+        Return the fully qualified collection name of a module.
+
+        :param name: Module name as used in a task.
+        :returns: str or None if the module can not be resolved
+
+        """
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self.path = os.path.join(self.directory, f"modules-{self._get_key()}.jsonl")
+                    self._load()
+                    self._loaded = True
+
+        if name in self.modules:
+            return self.modules[name]
+
+        fqcn = load_plugin(name).resolved_fqcn
+
+        with self._lock:
+            if name not in self.modules:
+                self.modules[name] = fqcn
+                if self.path:
+                    self._append(name, fqcn)
+
+        return fqcn
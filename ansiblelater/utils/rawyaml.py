@@ -0,0 +1,102 @@
+"""Utils for YAML file operations that do not need ansible."""
+
+
+# Copyright (c) 2013-2014 Will Thames <will@thames.id.au>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+def parse_raw_yaml(data):
+    """
+    Parse yaml without any ansible specific processing.
+
+    The `!unsafe` and `!vault` tags are loaded as plain strings.
+
+    """
+    return yaml.load(data, Loader=RawLoader)  # noqa: S506 RawLoader is a SafeLoader
+
+
+def normalized_lines(lines, options):
+    """
+    Return numbered lines without comments and optionally document markers and empty lines.
+
+    :param lines: List of lines of a file.
+    :param options: Dict with optional `remove_markers` and `remove_empty` flags.
+    :returns: list of (lineno, line) tuples
+
+    """
+    remove_markers = options.get("remove_markers")
+    remove_empty = options.get("remove_empty")
+
+    result = []
+    for i, line in enumerate(lines, start=1):
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            continue
+        # remove document starter also
+        if remove_markers and stripped == "---":
+            continue
+        # remove empty lines
+        if remove_empty and not stripped:
+            continue
+
+        result.append((i, line))
+
+    return result
+
+
+class UnsafeTag:
+    """Handle custom yaml unsafe tag."""
+
+    yaml_tag = "!unsafe"
+
+    def __init__(self, value):
+        self.unsafe = value
+
+    @staticmethod
+    def yaml_constructor(loader, node):
+        return loader.construct_scalar(node)
+
+
+class VaultTag:
+    """Handle custom yaml vault tag."""
+
+    yaml_tag = "!vault"
+
+    def __init__(self, value):
+        self.unsafe = value
+
+    @staticmethod
+    def yaml_constructor(loader, node):
+        return loader.construct_scalar(node)
+
+
+class RawLoader(SafeLoader):
+    """Safe YAML loader accepting ansible tags, backed by libyaml if available."""
+
+
+RawLoader.add_constructor(UnsafeTag.yaml_tag, UnsafeTag.yaml_constructor)
+RawLoader.add_constructor(VaultTag.yaml_tag, VaultTag.yaml_constructor)
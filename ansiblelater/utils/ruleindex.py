@@ -0,0 +1,123 @@
+"""Persistent index of the rules defined in rule directories."""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from ansiblelater import __version__, logger
+
+LOG = logger.get_logger(__name__)
+
+# Version of the index format, indexes of other versions are rebuilt.
+INDEX_FORMAT = 2
+
+# Files modified shortly before the index was written are not stored, the stat
+# data alone can not tell apart multiple writes within the same tick.
+RACY_WINDOW_NS = 2 * 10**9
+
+
+class RuleIndex:
+    """
+    Map the rule modules of a directory to the rules they define.
+
+    Entries hold the id, types and tags of every rule and the checksum of the
+    module and are only used while the stat data of the module file is unchanged.
+    Modules whose rules are all filtered out do not have to be imported at all.
+    """
+
+    def __init__(self, source, directory=None):
+        """
+        Initialize the rule index.
+
+        :param source: The rule directory to index.
+        :param directory: Optional directory to persist the index in.
+        :returns: None
+
+        """
+        self.source = source
+        self.entries = {}
+        self.changed = False
+        self.path = None
+
+        if directory:
+            name = hashlib.sha256(os.path.abspath(source).encode("utf-8")).hexdigest()[:16]
+            self.path = os.path.join(directory, f"rules-{name}.json")
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+
+            if data.get("version") == __version__ and data.get("format") == INDEX_FORMAT:
+                self.entries = data["modules"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+            LOG.debug(f"Ignoring rule index {self.path}: {e}")
+
+    @staticmethod
+    def _stat(path):
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+
+    def get(self, path):
+        """
+        Return the entry of a rule module or None if the module has to be imported.
+
+        :param path: Path of the rule module.
+        :returns: dict with `digest` and `rules` or None
+
+        """
+        entry = self.entries.get(os.path.basename(path))
+        if not entry:
+            return None
+
+        with contextlib.suppress(OSError):
+            if entry["stat"] == self._stat(path):
+                return entry
+
+        return None
+
+    def set(self, path, digest, rules):
+        """
+        Store the rules defined by a module.
+
+        :param path: Path of the rule module.
+        :param digest: Checksum of the module content.
+        :param rules: List of `{name, rid, types, tags}` dicts of the defined rules.
+        :returns: dict
+
+        """
+        stat = self._stat(path)
+        entry = {"stat": stat, "digest": digest, "rules": rules}
+
+        if time.time_ns() - stat[0] >= RACY_WINDOW_NS:
+            self.entries[os.path.basename(path)] = entry
+            self.changed = True
+
+        return entry
+
+    def save(self):
+        """Write the index if any entry was added."""
+        if not self.path or not self.changed:
+            return
+
+        modules = {
+            name: entry
+            for name, entry in self.entries.items()
+            if os.path.exists(os.path.join(self.source, name))
+        }
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": __version__, "format": INDEX_FORMAT, "modules": modules}, f)
+            os.replace(tmp, self.path)
+            self.changed = False
+        except OSError as e:
+            LOG.debug(f"Failed to write rule index {self.path}: {e}")
@@ -22,6 +22,7 @@
 
 import codecs
 import os
+import threading
 from contextlib import suppress
 
 import ansible.parsing.mod_args
@@ -36,6 +37,8 @@ from ansible.template import Templar
 from yaml.composer import Composer
 
 from ansiblelater.exceptions import LaterAnsibleError, LaterError
+from ansiblelater.utils import add_module_directory, module_loader, plugin_loader_lock
+from ansiblelater.utils.rawyaml import normalized_lines
 
 try:
     # Try to import the Ansible 2 module first, it's the future-proof one
@@ -64,13 +67,6 @@ def ansible_template(basedir, varname, templatevars, **kwargs):
     return templar.template(varname, **kwargs)
 
 
-try:
-    from ansible.plugins.loader import init_plugin_loader, module_loader
-
-    init_plugin_loader()
-except ImportError:
-    from ansible.plugins.loader import module_loader
-
 LINE_NUMBER_KEY = "__line__"
 FILENAME_KEY = "__file__"
 
@@ -117,6 +113,10 @@ VALID_KEYS = [
     FILENAME_KEY,
 ]
 
+_ANSIBLE_BUILTIN_TASKS = frozenset(ansible.parsing.mod_args.BUILTIN_TASKS)
+_installed_custom_modules = frozenset()
+_builtin_tasks_lock = threading.Lock()
+
 BLOCK_NAME_TO_ACTION_TYPE_MAP = {
     "tasks": "task",
     "handlers": "handler",
@@ -303,7 +303,7 @@ def _roles_children(basedir, k, v, parent_type, main="main"):  # noqa
 
 def _load_library_if_exists(path):
     if os.path.exists(path):
-        module_loader.add_directory(path)
+        add_module_directory(path)
 
 
 def _rolepath(basedir, role):
@@ -366,6 +366,33 @@ def _kv_to_dict(v):
     return dict(__ansible_module__=command, __ansible_arguments__=args, **kwargs)
 
 
+def install_custom_modules(custom_modules):
+    """
+    Add custom modules to the builtin tasks known by the ansible module args parser.
+
+    The builtin task set is only replaced if the custom modules have changed since the
+    last call, so the common case is a single set comparison.
+
+    :param custom_modules: List of custom module names.
+    :returns: None
+
+    """
+    global _installed_custom_modules
+
+    # The args parser resolves modules through the plugin loader, it has to be
+    # initialized with all known module directories first.
+    module_loader()
+
+    modules = frozenset(custom_modules)
+    if modules == _installed_custom_modules:
+        return
+
+    with _builtin_tasks_lock:
+        if modules != _installed_custom_modules:
+            ansible.parsing.mod_args.BUILTIN_TASKS = _ANSIBLE_BUILTIN_TASKS | modules
+            _installed_custom_modules = modules
+
+
 def normalize_task(task, filename, custom_modules=None):
     """Ensure tasks have an action key and strings are converted to python objects."""
 
@@ -386,13 +413,13 @@ def normalize_task(task, filename, custom_modules=None):
             }
             return normalized
 
-        builtin = list(ansible.parsing.mod_args.BUILTIN_TASKS)
-        builtin = list(set(builtin + custom_modules))
-        ansible.parsing.mod_args.BUILTIN_TASKS = frozenset(builtin)
+        install_custom_modules(custom_modules)
         mod_arg_parser = ModuleArgsParser(task)
 
         try:
-            action, arguments, normalized["delegate_to"] = mod_arg_parser.parse()
+            # The parser looks up modules and actions in the plugin loader caches.
+            with plugin_loader_lock:
+                action, arguments, normalized["delegate_to"] = mod_arg_parser.parse()
         except AnsibleParserError as e:
             raise LaterAnsibleError(e) from e
 
@@ -514,40 +541,54 @@ def add_action_type(actions, action_type, action_meta=None):
     return results
 
 
-def parse_yaml_linenumbers(data, filename):
+class LineNumberLoader(AnsibleLoader):
     """
-    Parse yaml as ansible.utils.parse_yaml but with linenumbers.
-
-    The line numbers are stored in each node's LINE_NUMBER_KEY key.
+    Ansible YAML loader storing line number and filename in each mapping.
 
+    The loader is backed by libyaml if available. Nodes are composed in C in that case
+    and the line number is taken from the node start mark.
     """
 
-    def compose_node(parent, index):
-        # the line number where the previous token has ended (plus empty lines)
-        line = loader.line
-        node = Composer.compose_node(loader, parent, index)
-        node.__line__ = line + 1
-        return node
+    def __init__(self, stream, filename):
+        AnsibleLoader.__init__(self, stream)
+        self.filename = filename
+
+    if issubclass(AnsibleLoader, Composer):
 
-    def construct_mapping(node, deep=False):
+        def compose_node(self, parent, index):
+            # the line number where the previous token has ended (plus empty lines)
+            line = self.line
+            node = Composer.compose_node(self, parent, index)
+            node.__line__ = line + 1
+            return node
+
+    def construct_mapping(self, node, deep=False):
         try:
-            mapping = AnsibleConstructor.construct_mapping(loader, node, deep=deep)
+            mapping = AnsibleConstructor.construct_mapping(self, node, deep=deep)
         except yaml.constructor.ConstructorError as e:
             raise LaterError("syntax error", e) from e
 
         if hasattr(node, "__line__"):
             mapping[LINE_NUMBER_KEY] = node.__line__
         else:
-            mapping[LINE_NUMBER_KEY] = mapping._line_number
-        mapping[FILENAME_KEY] = filename
+            mapping[LINE_NUMBER_KEY] = node.start_mark.line + 1
+        mapping[FILENAME_KEY] = self.filename
         return mapping
 
+
+def parse_yaml_linenumbers(data, filename):
+    """
+    Parse yaml as ansible.utils.parse_yaml but with linenumbers.
+
+    The line numbers are stored in each node's LINE_NUMBER_KEY key.
+
+    """
     try:
-        kwargs = {}
-        loader = AnsibleLoader(data, **kwargs)
-        loader.compose_node = compose_node
-        loader.construct_mapping = construct_mapping
-        data = loader.get_single_data() or []
+        loader = LineNumberLoader(data, filename)
+        try:
+            data = loader.get_single_data() or []
+        finally:
+            loader.dispose()
     except (
         yaml.parser.ParserError,
         yaml.scanner.ScannerError,
@@ -562,24 +603,10 @@ def parse_yaml_linenumbers(data, filename):
 
 def normalized_yaml(file, options):
     lines = []
-    removes = []
 
     try:
         with codecs.open(file, mode="rb", encoding="utf-8") as f:
-            lines = list(enumerate(f.readlines(), start=1))
-
-        for i, line in lines:
-            if line.strip().startswith("#"):
-                removes.append((i, line))
-            # remove document starter also
-            if options.get("remove_markers") and line.strip() == "---":
-                removes.append((i, line))
-            # remove empty lines
-            if options.get("remove_empty") and not line.strip():
-                removes.append((i, line))
-
-        for line in removes:
-            lines.remove(line)
+            lines = normalized_lines(f.readlines(), options)
     except (yaml.parser.ParserError, yaml.scanner.ScannerError) as e:
         raise LaterError("syntax error", e) from e
     return lines
@@ -603,29 +630,3 @@ def _extract_ansible_parsed_keys_from_task(result, task, keys):
             continue
         result[k] = v
     return result
-
-
-class UnsafeTag:
-    """Handle custom yaml unsafe tag."""
-
-    yaml_tag = "!unsafe"
-
-    def __init__(self, value):
-        self.unsafe = value
-
-    @staticmethod
-    def yaml_constructor(loader, node):
-        return loader.construct_scalar(node)
-
-
-class VaultTag:
-    """Handle custom yaml vault tag."""
-
-    yaml_tag = "!vault"
-
-    def __init__(self, value):
-        self.unsafe = value
-
-    @staticmethod
-    def yaml_constructor(loader, node):
-        return loader.construct_scalar(node)
@@ -0,0 +1,172 @@
+"""Review files again when they change."""
+
+import copy
+import os
+import time
+
+from yamllint.config import YamlLintConfigError
+
+from ansiblelater import LOG, executor, logger
+from ansiblelater.settings import Settings
+
+POLL_INTERVAL = 0.5
+DEBOUNCE_INTERVAL = 0.3
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class Watcher:
+    """
+    Keep reviewing files of the working directory as they change.
+
+    The rules, the ansible module loader and the yamllint config stay loaded between
+    reviews and only changed or added files are reviewed again. Files and the
+    directories containing them are polled, the settings are only reloaded if a
+    config file changed. Changed directories are scanned for added files on their own.
+    """
+
+    def __init__(self, args, settings, interval=POLL_INTERVAL, debounce=DEBOUNCE_INTERVAL):
+        """
+        Initialize a new watcher.
+
+        :param args: The dict of options, arguments and commands from the CLI.
+        :param settings: The `Settings` object of the initial run.
+        :param interval: Seconds between two polls.
+        :param debounce: Seconds without further changes before files are reviewed.
+        :returns: None
+
+        """
+        self.args = args
+        self.settings = settings
+        self.interval = interval
+        self.debounce = debounce
+        self.snapshot = {}
+
+    def _config_files(self):
+        cwd = os.getcwd()
+        return [
+            self.settings.config_file,
+            os.path.join(cwd, ".later"),
+            os.path.join(cwd, ".later.yml"),
+            os.path.join(cwd, ".later.yaml"),
+        ]
+
+    def _take_snapshot(self):
+        files = self.settings.config["rules"]["files"]
+        directories = {"."}
+        for filename in files:
+            directory = os.path.dirname(filename)
+            while directory and directory not in directories:
+                directories.add(directory)
+                directory = os.path.dirname(directory)
+
+        return {
+            "config": {path: _stat(path) for path in self._config_files()},
+            "directories": {path: _stat(path) for path in directories},
+            "files": {path: _stat(path) for path in files},
+        }
+
+    def _wait_for_changes(self):
+        while True:
+            time.sleep(self.interval)
+            snapshot = self._take_snapshot()
+            if snapshot != self.snapshot:
+                break
+
+        # Editors often save in bursts, wait until the tree has settled.
+        while True:
+            time.sleep(self.debounce)
+            settled = self._take_snapshot()
+            if settled == snapshot:
+                return snapshot
+            snapshot = settled
+
+    def _reload(self):
+        """
+        Reload the settings, the previous settings are kept if the new ones are invalid.
+
+        :returns: bool
+
+        """
+        try:
+            settings = Settings(args=copy.deepcopy(self.args))
+            executor.prepare(settings.config)
+        except (YamlLintConfigError, SystemExit) as e:
+            if isinstance(e, YamlLintConfigError):
+                LOG.error(f"Invalid yamllint settings: {e}")
+            LOG.error("Invalid configuration, keeping the previous settings")
+            executor.prepare(self.settings.config)
+            return False
+
+        self.settings = settings
+        config = self.settings.config
+        logger.update_logger(LOG, config["logging"]["level"], config["logging"]["json"])
+        return True
+
+    def _update_files(self, snapshot):
+        """
+        Drop removed files and add files discovered in changed directories.
+
+        :param snapshot: The snapshot the directory changes were detected in.
+        :returns: None
+
+        """
+        known = self.snapshot["directories"]
+        changed = [
+            path
+            for path, stat in snapshot["directories"].items()
+            if stat is not None and known.get(path) != stat
+        ]
+
+        files = [path for path, stat in snapshot["files"].items() if stat is not None]
+        files.extend(self.settings.discover(changed, skip=known))
+        self.settings.config["rules"]["files"] = list(dict.fromkeys(files))
+
+    def review(self, files=None):
+        """
+        Review the given files and remember the state of the tree they were reviewed in.
+
+        :param files: Optional list of files to review, defaults to all discovered files.
+        :returns: None
+
+        """
+        snapshot = self._take_snapshot()
+        if files is None:
+            files = self.settings.config["rules"]["files"]
+
+        errors = executor.run(self.settings, files)
+        LOG.info(f"Reviewed {len(files)} files, {errors} errors")
+        self.snapshot = snapshot
+
+    def watch(self):
+        """Review all files and keep reviewing changed files until interrupted."""
+        self.review()
+
+        while True:
+            snapshot = self._wait_for_changes()
+            previous = self.snapshot["files"]
+
+            if snapshot["config"] != self.snapshot["config"]:
+                if self._reload():
+                    LOG.info("Configuration changed, reviewing all files")
+                    self.review()
+                    continue
+
+                self.snapshot["config"] = snapshot["config"]
+
+            if snapshot["directories"] != self.snapshot["directories"]:
+                self._update_files(snapshot)
+                snapshot = self._take_snapshot()
+
+            changed = [
+                path
+                for path, stat in snapshot["files"].items()
+                if stat is not None and previous.get(path) != stat
+            ]
+            self.review(changed)